@@ -47,6 +47,9 @@ from .utils import (
     schedule_manager,
     schedule_store,
     api_status_store,
+    http_client_manager,
+    render_page_pool,
+    image_outbox,
 )
 
 __plugin_meta__ = PluginMetadata(
@@ -91,6 +94,7 @@ __all__ = [
 ]
 
 driver = get_driver()
+image_outbox.setup_route(driver)
 
 
 @driver.on_startup
@@ -111,6 +115,8 @@ async def startup():
     cache_dir = plugin_config.get_cache_dir()
     cache_dir.mkdir(parents=True, exist_ok=True)
     try:
+        await http_client_manager.startup()
+
         init_api_sources()
         logger.info("已初始化API源")
 
@@ -130,3 +136,13 @@ async def startup():
         logger.info("已初始化定时任务")
     except Exception as e:
         logger.error(f"初始化失败: {e}")
+
+
+@driver.on_shutdown
+async def shutdown():
+    await http_client_manager.close()
+    await render_page_pool.close()
+    news_cache.close()
+    await schedule_store.flush()
+    api_manager.save_status(immediate=False)
+    await api_status_store.flush()
@@ -5,7 +5,7 @@ from nonebot import logger
 from nonebot.adapters.onebot.v11 import Message, MessageSegment
 
 from ..models import NewsData, NewsItem
-from ..utils import get_today_date, render_news_to_image
+from ..utils import get_today_date, render_news_to_fit
 from ..utils.screenshot import capture_webpage_screenshot
 from .manager import api_manager
 
@@ -38,6 +38,16 @@ class BaseNewsHandler(ABC):
         """生成文本格式的消息"""
         pass
 
+    async def _fetch_shared_news_data(self) -> NewsData:
+        """通过同名日报源获取数据，与日报消息共享数据缓存"""
+        from .sources import news_sources
+
+        # 只使用已注册的日报源，适配器本身就通过处理器获取数据
+        source = news_sources.get(self.name)
+        if source:
+            return await source.get_news_data()
+        return await api_manager.fetch_data(self.name)
+
     async def get_news_item_by_index(self, index: int) -> Optional[NewsItem]:
         """根据索引获取新闻项"""
         try:
@@ -80,23 +90,19 @@ class BaseNewsHandler(ABC):
         try:
             news_data = self._process_news_items(news_data, max_items)
 
-            pic = await render_news_to_image(
+            pic, item_count = await render_news_to_fit(
                 news_data,
                 template_name,
                 f"{self.name} ({get_today_date()})",
                 {"date": get_today_date()},
+                max_bytes=1024 * 1024,
+                max_items=max_items,
+                min_items=max_items // 2,
             )
+            if not pic:
+                raise ValueError("生成的图片数据为空")
 
-            if len(pic) > 1024 * 1024:
-                logger.warning(f"{self.name}图片过大: {len(pic) / 1024 / 1024:.2f}MB，尝试减少条目")
-                news_data = self._process_news_items(news_data, max_items // 2)
-                pic = await render_news_to_image(
-                    news_data,
-                    template_name,
-                    f"{self.name} ({get_today_date()})",
-                    {"date": get_today_date()},
-                )
-
+            news_data.items = news_data.items[:item_count]
             return Message(MessageSegment.image(pic))
         except Exception as e:
             logger.error(f"{self.name}图片生成失败: {e}")
@@ -175,7 +181,7 @@ class ITHomeNewsHandler(BaseNewsHandler):
 
     async def fetch_news_data(self) -> NewsData:
         """获取新闻数据"""
-        return await api_manager.fetch_data(self.name)
+        return await self._fetch_shared_news_data()
 
     async def generate_image(self, news_data: NewsData) -> Message:
         """生成图片格式的消息"""
@@ -198,7 +204,7 @@ class ZhihuNewsHandler(BaseNewsHandler):
 
     async def fetch_news_data(self) -> NewsData:
         """获取新闻数据"""
-        return await api_manager.fetch_data(self.name)
+        return await self._fetch_shared_news_data()
 
     async def generate_image(self, news_data: NewsData) -> Message:
         """生成图片格式的消息"""
@@ -223,7 +229,7 @@ try:
             )
 
         async def fetch_news_data(self) -> NewsData:
-            return await api_manager.fetch_data(self.name)
+            return await self._fetch_shared_news_data()
 
         async def generate_image(self, news_data: NewsData) -> Message:
             return await self._generate_standard_image(news_data, "weibo_hot.html")
@@ -1,29 +1,56 @@
+import asyncio
 import time
+from collections import deque
 from typing import Any
 
-from nonebot import logger
+from nonebot import logger, get_plugin_config
 
-from ..config import config
+from ..config import config, CircuitState, Config
 from ..exceptions import (
+    APICircuitOpenException,
     APIException,
     APIResponseParseException,
     NoAvailableAPIException,
 )
 from ..models import ApiSource, NewsData
-from ..utils import fetch_with_retry, api_status_store
+from ..utils import (
+    fetch_with_retry,
+    api_status_store,
+    get_http_client,
+    host_limiter,
+    percentile,
+    validator_cache,
+)
+from ..utils.concurrency import SingleFlight
 from .parsers import get_parser
 
 
 class ApiManager:
     """API管理器"""
 
+    LATENCY_WINDOW = 50
+    HEDGE_MIN_SAMPLES = 5
+    LATENCY_SMOOTHING = 0.3
+    SUCCESS_SMOOTHING = 0.2
+    HEALTHY_SUCCESS_RATE = 0.5
+    PROBE_CONCURRENCY = 4
+    HEAD_PROBE_PARSERS = ("binary_image",)
+
     def __init__(self):
         """初始化API管理器"""
         self.api_sources: dict[str, list[ApiSource]] = {}
         self.api_status: dict[str, dict[str, Any]] = {}
+        self._fetch_flight: SingleFlight[NewsData] = SingleFlight("API请求")
+        self._latencies: dict[str, deque[float]] = {}
+        self._probing: set[tuple[str, str]] = set()
+        self._parsed: dict[tuple[str, tuple], NewsData] = {}
 
-    def save_status(self) -> bool:
-        """保存API源状态到文件"""
+    def save_status(self, immediate: bool = True) -> bool:
+        """保存API源状态到文件
+
+        Args:
+            immediate: 是否立即写入，否则在短暂延迟后与其他修改合并写入
+        """
         try:
             status_data = {}
             for news_type, sources in self.api_sources.items():
@@ -37,11 +64,19 @@ class ApiManager:
                             "failure_count": source.failure_count,
                             "priority": source.priority,
                             "parser": source.parser,
+                            "ewma_latency": source.ewma_latency,
+                            "success_rate": source.success_rate,
+                            "last_error": source.last_error,
+                            "circuit_state": source.circuit_state,
+                            "circuit_opened_at": source.circuit_opened_at,
                         }
                     )
 
             api_status_store.data = status_data
-            api_status_store.save()
+            if immediate:
+                api_status_store.save_now()
+            else:
+                api_status_store.save()
 
             logger.debug("已保存API源状态")
             return True
@@ -84,6 +119,12 @@ class ApiManager:
                         source.enabled = source_data["enabled"]
                         logger.debug(f"已加载API源 {url} 的启用状态: {source.enabled}")
 
+                    source.ewma_latency = source_data.get("ewma_latency", source.ewma_latency)
+                    source.success_rate = source_data.get("success_rate", source.success_rate)
+                    source.last_error = source_data.get("last_error", source.last_error)
+                    source.circuit_state = source_data.get("circuit_state", source.circuit_state)
+                    source.circuit_opened_at = source_data.get("circuit_opened_at", source.circuit_opened_at)
+
             logger.info("已加载API源状态")
             return True
         except Exception as e:
@@ -160,6 +201,11 @@ class ApiManager:
             source.enabled = True
             source.failure_count = 0
             source.last_success = 0
+            source.ewma_latency = 0
+            source.success_rate = 1.0
+            source.last_error = ""
+            source.circuit_state = CircuitState.CLOSED
+            source.circuit_opened_at = 0
 
             if news_type in self.api_status and url in self.api_status[news_type]:
                 self.api_status[news_type][url] = {
@@ -190,25 +236,58 @@ class ApiManager:
 
         return count
 
-    def update_api_source_status(self, news_type: str, url: str, success: bool) -> None:
-        """更新API源状态"""
+    def update_api_source_status(
+        self,
+        news_type: str,
+        url: str,
+        success: bool,
+        latency: float | None = None,
+        error: BaseException | None = None,
+        record_stats: bool = True,
+    ) -> None:
+        """更新API源状态和熔断器状态
+
+        Args:
+            news_type: 日报类型
+            url: API源URL
+            success: 是否成功获取并解析
+            latency: 成功时的请求耗时（秒）
+            error: 失败时的异常
+            record_stats: 是否计入成功率和延迟，HEAD 探测和304响应只更新熔断器状态
+        """
         source = self.get_api_source(news_type, url)
         if not source:
             return
 
-        status_changed = False
+        circuit_changed = False
+        if record_stats:
+            outcome = 1.0 if success else 0.0
+            source.success_rate += (outcome - source.success_rate) * self.SUCCESS_SMOOTHING
 
         if success:
             source.last_success = time.time()
             source.failure_count = 0
+            if latency is not None and record_stats:
+                self._update_ewma_latency(source, latency)
+
+            if source.circuit_state != CircuitState.CLOSED:
+                source.circuit_state = CircuitState.CLOSED
+                source.circuit_opened_at = 0
+                circuit_changed = True
+                logger.info(f"API源 {url} 已恢复，熔断器关闭")
         else:
             source.failure_count += 1
-
-            if source.failure_count >= config.daily_news_max_retries * 2:
-                if source.enabled:
-                    source.enabled = False
-                    status_changed = True
-                    logger.warning(f"API源 {url} 失败次数过多，已自动禁用")
+            if error is not None:
+                source.last_error = type(error).__name__
+
+            threshold = max(1, get_plugin_config(Config).daily_news_circuit_threshold)
+            if source.circuit_state == CircuitState.HALF_OPEN or (
+                source.circuit_state == CircuitState.CLOSED and source.failure_count >= threshold
+            ):
+                source.circuit_state = CircuitState.OPEN
+                source.circuit_opened_at = time.time()
+                circuit_changed = True
+                logger.warning(f"API源 {url} 连续失败 {source.failure_count} 次，熔断器打开")
 
         if news_type in self.api_status and url in self.api_status[news_type]:
             self.api_status[news_type][url] = {
@@ -217,30 +296,247 @@ class ApiManager:
                 "failure_count": source.failure_count,
             }
 
-        if status_changed:
-            self.save_status()
+        # 熔断器状态变化立即保存，延迟和成功率的更新合并后写入
+        self.save_status(immediate=circuit_changed)
 
-    def get_best_api_source(self, news_type: str) -> ApiSource | None:
-        """获取最佳API源"""
-        sources = self.get_enabled_api_sources(news_type)
-        if not sources:
-            return None
+    def _update_ewma_latency(self, source: ApiSource, latency: float) -> None:
+        """将一次耗时计入API源的平滑延迟"""
+        if source.ewma_latency <= 0:
+            source.ewma_latency = latency
+        else:
+            source.ewma_latency += (latency - source.ewma_latency) * self.LATENCY_SMOOTHING
 
-        sources.sort(key=lambda x: x.priority)
+    def record_cancelled_latency(self, news_type: str, url: str, elapsed: float) -> None:
+        """记录被取消请求已等待的时间，作为该源耗时的下限，不影响成功率"""
+        source = self.get_api_source(news_type, url)
+        if source and elapsed > source.ewma_latency:
+            self._update_ewma_latency(source, elapsed)
+            self.save_status(immediate=False)
 
-        if sources[0].last_success > 0:
-            return sources[0]
+    def _circuit_allows(self, news_type: str, source: ApiSource) -> bool:
+        """检查熔断器是否允许请求该源，不改变熔断器状态"""
+        if source.circuit_state == CircuitState.CLOSED:
+            return True
+        if source.circuit_state == CircuitState.OPEN:
+            cooldown = get_plugin_config(Config).daily_news_circuit_cooldown
+            return time.time() - source.circuit_opened_at >= cooldown
+        return (news_type, source.url) not in self._probing
+
+    def get_circuit_remaining(self, source: ApiSource) -> float:
+        """获取熔断器打开状态的剩余冷却时间（秒）"""
+        if source.circuit_state != CircuitState.OPEN:
+            return 0.0
+        cooldown = get_plugin_config(Config).daily_news_circuit_cooldown
+        return max(0.0, cooldown - (time.time() - source.circuit_opened_at))
+
+    def _rank_key(self, source: ApiSource) -> tuple:
+        """自适应排序键：成功率正常的已测量源按预计耗时排在前面，未测量的源按优先级其次，成功率低的源最后"""
+        expected = source.expected_latency()
+        if expected is None:
+            return (1, source.priority, 0.0)
+        if source.success_rate < self.HEALTHY_SUCCESS_RATE:
+            return (2, expected, source.priority)
+        return (0, expected, source.priority)
+
+    def rank_api_sources(self, news_type: str) -> list[ApiSource]:
+        """按预计获得有效响应的耗时排序可请求的API源，熔断中的源会被跳过
+
+        未启用自适应排序时只按优先级排序。
+        """
+        sources = [
+            source for source in self.get_enabled_api_sources(news_type) if self._circuit_allows(news_type, source)
+        ]
+        if get_plugin_config(Config).daily_news_adaptive_ranking:
+            sources.sort(key=self._rank_key)
+        else:
+            sources.sort(key=lambda x: x.priority)
+        return sources
 
-        return sources[0]
+    def get_best_api_source(self, news_type: str) -> ApiSource | None:
+        """获取最佳API源"""
+        sources = self.rank_api_sources(news_type)
+        return sources[0] if sources else None
 
     async def fetch_data(self, news_type: str, extra_params: dict = None, api_index: int = None) -> NewsData:
-        """获取数据
+        """获取数据，相同参数的并发请求只会访问一次API
 
         Args:
             news_type: 日报类型
             extra_params: 额外的请求参数
             api_index: 指定API源索引 (1-based)
         """
+        params_key = tuple(sorted((str(k), str(v)) for k, v in (extra_params or {}).items()))
+        news_data = await self._fetch_flight.do(
+            (news_type, api_index, params_key),
+            lambda: self._fetch_data(news_type, extra_params, api_index),
+        )
+        # 调用方会截断条目列表，返回副本避免互相影响
+        return news_data.copy()
+
+    def _record_latency(self, news_type: str, latency: float) -> None:
+        """记录一次成功请求的耗时"""
+        window = self._latencies.get(news_type)
+        if window is None:
+            window = self._latencies[news_type] = deque(maxlen=self.LATENCY_WINDOW)
+        window.append(latency)
+
+    def get_hedge_delay(self, news_type: str) -> float:
+        """获取对冲等待时间，样本足够时为近期请求耗时的p95"""
+        window = self._latencies.get(news_type)
+        if not window or len(window) < self.HEDGE_MIN_SAMPLES:
+            return get_plugin_config(Config).daily_news_hedge_default_delay
+        return percentile(list(window), 95)
+
+    def _is_hedge_enabled(self, news_type: str, api_index: int | None) -> bool:
+        """检查是否对该日报类型使用对冲请求"""
+        if api_index is not None or not config.daily_news_auto_failover:
+            return False
+        if news_type not in get_plugin_config(Config).daily_news_hedge_types:
+            return False
+        return len(self.rank_api_sources(news_type)) > 1
+
+    async def _request_and_parse(
+        self, source: ApiSource, params: dict, max_retries: int
+    ) -> tuple[NewsData, bool]:
+        """请求并解析API源，内容未变化（304）时复用上次的解析结果
+
+        Returns:
+            解析结果，以及是否复用了上次的解析结果
+        """
+        key = validator_cache.get_key(source.url, params)
+        cached = self._parsed.get(key)
+        if cached is None:
+            # 没有可复用的解析结果时不能发送条件请求
+            validator_cache.forget(source.url, params)
+
+        response = await fetch_with_retry(
+            source.url,
+            max_retries=max_retries,
+            timeout=config.daily_news_timeout,
+            params=params,
+            conditional=True,
+        )
+
+        if response.status_code == 304 and cached is not None:
+            logger.debug(f"API源 {source.url} 内容未变化，复用上次的解析结果")
+            return cached.copy(), True
+
+        try:
+            news_data = await get_parser(source.parser).parse(response)
+        except Exception as e:
+            validator_cache.forget(source.url, params)
+            self._parsed.pop(key, None)
+            raise APIResponseParseException(
+                message=f"API响应解析失败: {e}",
+                api_url=source.url,
+                parser=source.parser,
+            ) from e
+
+        if validator_cache.has(source.url, params):
+            self._parsed[key] = news_data.copy()
+        else:
+            self._parsed.pop(key, None)
+        return news_data, False
+
+    async def _fetch_from_source(
+        self,
+        news_type: str,
+        source: ApiSource,
+        extra_params: dict = None,
+        check_circuit: bool = True,
+    ) -> NewsData:
+        """请求并解析单个API源，更新其状态
+
+        熔断器打开时直接抛出异常；冷却结束后转为半开状态，只放行一个不重试的探测请求。
+        """
+        key = (news_type, source.url)
+        probing = False
+        if check_circuit:
+            if not self._circuit_allows(news_type, source):
+                raise APICircuitOpenException(api_url=source.url, retry_after=self.get_circuit_remaining(source))
+            if source.circuit_state != CircuitState.CLOSED:
+                source.circuit_state = CircuitState.HALF_OPEN
+                self._probing.add(key)
+                probing = True
+                logger.info(f"API源 {source.url} 冷却结束，发送探测请求")
+
+        params = dict(extra_params or {})
+        if params:
+            logger.debug(f"添加额外请求参数: {extra_params}")
+
+        started = time.monotonic()
+        try:
+            try:
+                news_data, _ = await self._request_and_parse(
+                    source,
+                    params,
+                    max_retries=0 if probing else config.daily_news_max_retries,
+                )
+            except asyncio.CancelledError:
+                # 对冲请求落败被取消时不会记录耗时，已等待的时间至少说明该源比这更慢
+                self.record_cancelled_latency(news_type, source.url, time.monotonic() - started)
+                raise
+            except Exception as e:
+                self.update_api_source_status(news_type, source.url, False, error=e.__cause__ or e)
+                raise
+        finally:
+            if probing:
+                self._probing.discard(key)
+
+        latency = time.monotonic() - started
+        self.update_api_source_status(news_type, source.url, True, latency=latency)
+        self._record_latency(news_type, latency)
+        return news_data
+
+    async def _fetch_hedged(self, news_type: str, extra_params: dict = None) -> NewsData:
+        """对冲请求：当前API源超时未返回或失败时并行请求下一个API源，采用最先成功的结果"""
+        remaining = self.rank_api_sources(news_type)
+        delay = self.get_hedge_delay(news_type)
+        running: dict[asyncio.Task, ApiSource] = {}
+
+        def launch() -> None:
+            source = remaining.pop(0)
+            task = asyncio.create_task(self._fetch_from_source(news_type, source, extra_params))
+            running[task] = source
+            logger.debug(f"对冲请求API源: {source.url}, 优先级: {source.priority}")
+
+        launch()
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=delay if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if not done:
+                    slow = ", ".join(source.url for source in running.values())
+                    logger.info(f"API源 {slow} 在 {delay:.1f}秒内未返回，并行请求下一个API源")
+                    launch()
+                    continue
+
+                for task in done:
+                    source = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        logger.debug(f"成功从API源 {source.url} 获取 {news_type} 日报数据（对冲请求）")
+                        return task.result()
+                    logger.warning(f"API源 {source.url} 请求失败: {error}")
+
+                if remaining:
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+
+        logger.error(f"所有API源都失败，日报类型: {news_type}")
+        raise NoAvailableAPIException(news_type=news_type)
+
+    async def _fetch_data(self, news_type: str, extra_params: dict = None, api_index: int = None) -> NewsData:
+        """实际获取数据"""
+        if self._is_hedge_enabled(news_type, api_index):
+            return await self._fetch_hedged(news_type, extra_params)
+
         if api_index is not None:
             sources = self.get_enabled_api_sources(news_type)
             if not sources:
@@ -257,70 +553,28 @@ class ApiManager:
             if not source:
                 raise NoAvailableAPIException(news_type=news_type)
 
-        parser = get_parser(source.parser)
-
         failover_enabled = config.daily_news_auto_failover and api_index is None
         logger.debug(
             f"日报类型: {news_type}, API源: {source.url}, 故障转移已{'启用' if failover_enabled else '禁用'}"
         )
 
         try:
-            url = source.url
-            params = {}
-
-            if extra_params:
-                params.update(extra_params)
-                logger.debug(f"添加额外请求参数: {extra_params}")
-
-            logger.debug(f"尝试请求主API源: {url}, 参数: {params}")
-
-            response = await fetch_with_retry(
-                url,
-                max_retries=config.daily_news_max_retries,
-                timeout=config.daily_news_timeout,
-                params=params,
+            logger.debug(f"尝试请求主API源: {source.url}")
+            # 手动指定的API源不受熔断器限制
+            news_data = await self._fetch_from_source(
+                news_type, source, extra_params, check_circuit=api_index is None
             )
-
-            try:
-                news_data = await parser.parse(response)
-
-                self.update_api_source_status(news_type, source.url, True)
-                logger.debug(f"成功从API源 {source.url} 获取 {news_type} 日报数据")
-
-                return news_data
-            except Exception as e:
-                self.update_api_source_status(news_type, source.url, False)
-
-                logger.error(f"API响应解析失败: {e}")
-
-                if failover_enabled:
-                    logger.warning(f"API源 {source.url} 响应解析失败，尝试其他API源")
-                    return await self._try_failover_sources(news_type, source.url, extra_params)
-
-                raise APIResponseParseException(
-                    message=f"API响应解析失败: {e}",
-                    api_url=source.url,
-                    parser=source.parser,
-                )
-        except APIException as e:
-            self.update_api_source_status(news_type, source.url, False)
+            logger.debug(f"成功从API源 {source.url} 获取 {news_type} 日报数据")
+            return news_data
+        except Exception as e:
             logger.error(f"API请求失败: {e}")
 
             if failover_enabled:
                 logger.warning(f"API源 {source.url} 请求失败，尝试其他API源")
                 return await self._try_failover_sources(news_type, source.url, extra_params)
-            else:
-                logger.warning("故障转移已禁用，不尝试其他API源")
-                raise
-        except Exception as e:
-            self.update_api_source_status(news_type, source.url, False)
-            logger.error(f"获取数据时发生未知错误: {e}")
 
-            if failover_enabled:
-                logger.warning(f"API源 {source.url} 发生未知错误，尝试其他API源")
-                return await self._try_failover_sources(news_type, source.url, extra_params)
-            else:
-                raise
+            logger.warning("故障转移已禁用，不尝试其他API源")
+            raise
 
     async def _try_failover_sources(
         self, news_type: str, failed_url: str, extra_params: dict = None
@@ -332,52 +586,114 @@ class ApiManager:
             failed_url: 失败的API源URL
             extra_params: 额外的请求参数
         """
-        other_sources = [s for s in self.get_enabled_api_sources(news_type) if s.url != failed_url]
+        other_sources = [s for s in self.rank_api_sources(news_type) if s.url != failed_url]
 
         if not other_sources:
             logger.error(f"没有可用的备用API源，日报类型: {news_type}")
             raise NoAvailableAPIException(news_type=news_type)
 
-        other_sources.sort(key=lambda x: x.priority)
-        logger.info(f"找到 {len(other_sources)} 个备用API源，将按优先级尝试")
+        logger.info(f"找到 {len(other_sources)} 个备用API源，将按顺序尝试")
 
         for other_source in other_sources:
             try:
-                other_parser = get_parser(other_source.parser)
                 logger.info(f"尝试备用API源: {other_source.url}, 优先级: {other_source.priority}")
+                news_data = await self._fetch_from_source(news_type, other_source, extra_params)
+                logger.info(f"成功从备用API源 {other_source.url} 获取 {news_type} 日报数据")
+                return news_data
+            except Exception as other_e:
+                logger.error(f"备用API源 {other_source.url} 请求失败: {other_e}")
 
-                url = other_source.url
-                params = {}
-
-                if extra_params:
-                    params.update(extra_params)
-                    logger.debug(f"添加额外请求参数: {extra_params}")
+        logger.error(f"所有备用API源都失败，日报类型: {news_type}")
+        raise NoAvailableAPIException(news_type=news_type)
 
-                logger.debug(f"尝试请求备用API源: {url}, 参数: {params}")
+    async def _probe_request(self, source: ApiSource) -> bool:
+        """向API源发送一次探测请求，失败时抛出异常
 
-                other_response = await fetch_with_retry(
-                    url,
-                    max_retries=config.daily_news_max_retries,
+        Returns:
+            是否完整请求并解析了响应，HEAD 请求和304响应的耗时与实际请求不同
+        """
+        if source.parser in self.HEAD_PROBE_PARSERS:
+            # 图片源只检查是否可访问，不下载图片
+            async with host_limiter.limit(source.url):
+                response = await get_http_client().head(
+                    source.url,
                     timeout=config.daily_news_timeout,
-                    params=params,
+                    follow_redirects=True,
                 )
+            if response.status_code not in (405, 501):
+                if response.status_code >= 400:
+                    raise APIException("API探测失败", status_code=response.status_code, api_url=source.url)
+                return False
 
-                try:
-                    news_data = await other_parser.parse(other_response)
+        _, unchanged = await self._request_and_parse(source, {}, max_retries=0)
+        return not unchanged
 
-                    self.update_api_source_status(news_type, other_source.url, True)
-                    logger.info(f"成功从备用API源 {other_source.url} 获取 {news_type} 日报数据")
+    async def probe_api_source(self, news_type: str, source: ApiSource) -> bool | None:
+        """探测单个API源并更新其熔断器状态
 
-                    return news_data
-                except Exception as parse_e:
-                    self.update_api_source_status(news_type, other_source.url, False)
-                    logger.error(f"备用API源 {other_source.url} 响应解析失败: {parse_e}")
-            except Exception as other_e:
-                self.update_api_source_status(news_type, other_source.url, False)
-                logger.error(f"备用API源 {other_source.url} 请求失败: {other_e}")
+        完整请求并解析的探测与实际请求相同，计入延迟和成功率；
+        HEAD 请求和304响应的耗时与实际请求不同，只更新熔断器状态。
 
-        logger.error(f"所有备用API源都失败，日报类型: {news_type}")
-        raise NoAvailableAPIException(news_type=news_type)
+        Returns:
+            是否可用，源已在探测中时返回None
+        """
+        key = (news_type, source.url)
+        if key in self._probing:
+            return None
+
+        self._probing.add(key)
+        started = time.monotonic()
+        try:
+            measured = await self._probe_request(source)
+        except Exception as e:
+            logger.debug(f"API源 {source.url} 探测失败: {e}")
+            self.update_api_source_status(
+                news_type,
+                source.url,
+                False,
+                error=e.__cause__ or e,
+                record_stats=source.parser not in self.HEAD_PROBE_PARSERS,
+            )
+            return False
+        finally:
+            self._probing.discard(key)
+
+        self.update_api_source_status(
+            news_type,
+            source.url,
+            True,
+            latency=time.monotonic() - started if measured else None,
+            record_stats=measured,
+        )
+        return True
+
+    async def probe_all(self) -> dict[str, int]:
+        """探测所有已启用的API源"""
+        semaphore = asyncio.Semaphore(self.PROBE_CONCURRENCY)
+
+        async def probe(news_type: str, source: ApiSource) -> bool | None:
+            async with semaphore:
+                return await self.probe_api_source(news_type, source)
+
+        targets = [
+            (news_type, source)
+            for news_type, sources in self.api_sources.items()
+            for source in sources
+            if source.enabled
+        ]
+        started = time.monotonic()
+        results = await asyncio.gather(*(probe(news_type, source) for news_type, source in targets))
+
+        stats = {
+            "total": len(targets),
+            "healthy": sum(1 for result in results if result is True),
+            "failed": sum(1 for result in results if result is False),
+        }
+        logger.info(
+            f"API源健康探测完成: 正常 {stats['healthy']}/{stats['total']}，失败 {stats['failed']}，"
+            f"耗时 {time.monotonic() - started:.1f}秒"
+        )
+        return stats
 
     def get_api_status(self, news_type: str | None = None) -> dict[str, Any]:
         """获取API状态"""
@@ -387,6 +703,7 @@ class ApiManager:
                 "sources": [],
             }
 
+            ranks = {source.url: rank for rank, source in enumerate(self.rank_api_sources(news_type), 1)}
             for source in self.get_api_sources(news_type):
                 result["sources"].append(
                     {
@@ -396,6 +713,13 @@ class ApiManager:
                         "failure_count": source.failure_count,
                         "priority": source.priority,
                         "parser": source.parser,
+                        "ewma_latency": source.ewma_latency,
+                        "success_rate": source.success_rate,
+                        "last_error": source.last_error,
+                        "expected_latency": source.expected_latency(),
+                        "circuit_state": source.circuit_state,
+                        "circuit_remaining": self.get_circuit_remaining(source),
+                        "rank": ranks.get(source.url),
                     }
                 )
 
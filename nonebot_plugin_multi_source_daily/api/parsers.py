@@ -6,6 +6,7 @@ from nonebot import logger
 
 from ..exceptions import APIResponseParseException
 from ..models import NewsData, NewsItem
+from ..utils.http import get_http_client, host_limiter
 
 
 class ApiParser(ABC):
@@ -639,15 +640,14 @@ class MoyuJsonParser(ApiParser):
             )
 
             try:
-                import httpx
-
-                async with httpx.AsyncClient() as client:
+                client = get_http_client()
+                async with host_limiter.limit(image_url):
                     image_response = await client.get(image_url)
-                    if image_response.status_code == 200:
-                        news_data.binary_data = image_response.content
-                        logger.debug(f"成功获取摸鱼日历图片数据，大小: {len(image_response.content)} 字节")
-                    else:
-                        logger.warning(f"获取摸鱼日历图片失败，状态码: {image_response.status_code}")
+                if image_response.status_code == 200:
+                    news_data.binary_data = image_response.content
+                    logger.debug(f"成功获取摸鱼日历图片数据，大小: {len(image_response.content)} 字节")
+                else:
+                    logger.warning(f"获取摸鱼日历图片失败，状态码: {image_response.status_code}")
             except Exception as img_e:
                 logger.warning(f"获取摸鱼日历图片数据时出错: {img_e}")
 
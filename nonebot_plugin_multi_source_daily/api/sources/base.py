@@ -1,4 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable
 
 from nonebot import logger, get_plugin_config
 from nonebot.adapters.onebot.v11 import Message, MessageSegment
@@ -7,8 +9,13 @@ from ...config import Config
 from ...exceptions import (
     FormatTypeException,
 )
-from ...models import NewsData
+from ...models import NewsData, NewsItem
 from ...utils import news_cache
+from ...utils.concurrency import SingleFlight
+
+_fetch_flight: SingleFlight[Message] = SingleFlight("日报源")
+_data_flight: SingleFlight[NewsData] = SingleFlight("日报数据")
+_refresh_tasks: set[asyncio.Task] = set()
 
 
 class BaseNewsSource(ABC):
@@ -63,16 +70,44 @@ class BaseNewsSource(ABC):
         logger.debug(f"验证后的格式: {format_type}")
 
         if not force_refresh:
-            cached_data = news_cache.get(self.name, format_type, api_index)
+            await news_cache.restore(self.name, format_type, api_index)
+            cached_data, is_stale = news_cache.lookup(self.name, format_type, api_index)
             if cached_data:
                 cache_info = f"格式: {format_type}"
                 if api_index is not None:
                     cache_info += f", API源: {api_index}"
                 logger.debug(f"从缓存获取{self.name}日报，{cache_info}")
+                if is_stale:
+                    self._schedule_refresh(format_type, api_index)
                 return cached_data
 
+        return await self._shared_fetch(format_type, api_index, force_refresh)
+
+    def _shared_fetch(
+        self, format_type: str, api_index: int = None, force_refresh: bool = False
+    ) -> Awaitable[Message]:
+        """以合并并发请求的方式获取并生成消息"""
+        return _fetch_flight.do(
+            (self.name, format_type, api_index),
+            lambda: self._fetch_and_render(format_type, api_index, force_refresh),
+        )
+
+    def _schedule_refresh(self, format_type: str, api_index: int = None) -> None:
+        """在后台刷新已陈旧的缓存"""
+        if _fetch_flight.is_running((self.name, format_type, api_index)):
+            return
+
+        logger.debug(f"{self.name}日报缓存已陈旧，先返回旧数据并在后台刷新")
+        task = asyncio.create_task(self._shared_fetch(format_type, api_index))
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+
+    async def _fetch_and_render(
+        self, format_type: str, api_index: int = None, force_refresh: bool = False
+    ) -> Message:
+        """获取数据并生成消息，同一类型、格式和API源的并发请求共享此过程"""
         try:
-            news_data = await self.fetch_data(api_index=api_index)
+            news_data = await self.get_news_data(api_index=api_index, force_refresh=force_refresh)
 
             if (
                 format_type == "image"
@@ -88,7 +123,9 @@ class BaseNewsSource(ABC):
                     message.append(display_name)
                     logger.debug(f"已为{self.name}日报添加显示名称: {display_name}")
 
-                news_cache.set(self.name, format_type, message, api_index=api_index)
+                news_cache.set(
+                    self.name, format_type, message, api_index=api_index, items=news_data.items or None
+                )
 
                 return message
 
@@ -113,13 +150,42 @@ class BaseNewsSource(ABC):
                         message.append(display_name)
                         logger.debug(f"已为{self.name}日报添加显示名称: {display_name}")
 
-                news_cache.set(self.name, format_type, message, api_index=api_index)
+                # 生成消息时条目列表已被截断为实际展示的条目
+                news_cache.set(
+                    self.name, format_type, message, api_index=api_index, items=news_data.items
+                )
 
             return message
         except Exception as e:
             logger.error(f"获取{self.name}日报失败: {e}")
             return Message(f"获取{self.name}日报失败: {e}")
 
+    def get_displayed_items(
+        self, message: Message, format_type: str = None, api_index: int = None
+    ) -> list[NewsItem] | None:
+        """获取 fetch 返回的消息中实际展示的新闻条目"""
+        return news_cache.get_items(self.name, self.validate_format(format_type), api_index, message)
+
+    async def get_news_data(self, api_index: int = None, force_refresh: bool = False) -> NewsData:
+        """获取原始数据，优先使用数据缓存，不同格式的生成和详情查询共享同一次请求"""
+        if not force_refresh:
+            await news_cache.restore(self.name, news_cache.DATA_FORMAT, api_index)
+            news_data = news_cache.get_data(self.name, api_index)
+            if news_data is not None:
+                logger.debug(f"从数据缓存获取{self.name}日报原始数据")
+                return news_data
+
+        news_data = await _data_flight.do((self.name, api_index), lambda: self._fetch_and_cache_data(api_index))
+        # 生成消息时会截断条目列表，返回副本避免互相影响
+        return news_data.copy()
+
+    async def _fetch_and_cache_data(self, api_index: int = None) -> NewsData:
+        """获取原始数据并写入数据缓存"""
+        news_data = await self.fetch_data(api_index=api_index)
+        if news_data and (news_data.items or news_data.binary_data):
+            news_cache.set_data(self.name, news_data, api_index=api_index)
+        return news_data
+
     @abstractmethod
     async def fetch_data(self, api_index: int = None) -> NewsData:
         """获取原始数据"""
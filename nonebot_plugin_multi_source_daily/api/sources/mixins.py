@@ -5,7 +5,7 @@ from nonebot import logger
 from nonebot.adapters.onebot.v11 import Message, MessageSegment
 
 from ...models import NewsData
-from ...utils import get_today_date, render_news_to_image
+from ...utils import get_today_date, render_news_to_fit, render_news_to_image
 
 
 class ImageRenderMixin(ABC):
@@ -222,45 +222,33 @@ class ImageSizeOptimizationMixin(ABC):
 
         logger.debug("未检测到二进制图片数据，将文本渲染为图片")
 
-        for step_items in size_reduction_steps:
-            try:
-                current_items = news_data.items[:step_items]
-                temp_news_data = NewsData(
-                    title=news_data.title,
-                    items=current_items,
-                    update_time=news_data.update_time,
-                    source=news_data.source,
-                )
-
-                for i, item in enumerate(temp_news_data.items):
-                    if not item.index:
-                        item.index = i + 1
-                    if not item.url:
-                        item.url = "#"
-
-                template_data = {"date": get_today_date()}
-                if extra_data:
-                    template_data.update(extra_data)
-
-                pic = await render_news_to_image(
-                    temp_news_data,
-                    template_name,
-                    title,
-                    template_data,
-                )
-
-                if pic and len(pic) > 0:
-                    size_mb = len(pic) / 1024 / 1024
-                    if size_mb <= max_size_mb:
-                        logger.debug(f"成功渲染图片，大小: {size_mb:.2f}MB")
-                        return Message(MessageSegment.image(pic))
-                    else:
-                        logger.warning(f"图片过大: {size_mb:.2f}MB，尝试减少条目到{step_items}条")
-                        continue
+        for i, item in enumerate(news_data.items):
+            if not item.index:
+                item.index = i + 1
+            if not item.url:
+                item.url = "#"
 
-            except Exception as e:
-                logger.error(f"渲染图片失败: {e}")
-                continue
+        template_data = {"date": get_today_date()}
+        if extra_data:
+            template_data.update(extra_data)
+
+        try:
+            pic, item_count = await render_news_to_fit(
+                news_data,
+                template_name,
+                title,
+                template_data,
+                max_bytes=int(max_size_mb * 1024 * 1024),
+                max_items=max(size_reduction_steps),
+                min_items=min(size_reduction_steps),
+            )
+        except Exception as e:
+            logger.error(f"渲染图片失败: {e}")
+            pic = None
+
+        if not pic:
+            logger.error("图片渲染失败")
+            return Message(f"获取{self.name}日报失败: 图片渲染失败")
 
-        logger.error("所有图片渲染尝试都失败")
-        return Message(f"获取{self.name}日报失败: 图片渲染失败")
+        news_data.items = news_data.items[:item_count]
+        return Message(MessageSegment.image(pic))
@@ -22,6 +22,7 @@ if HAS_HTMLRENDER:
 
 
 from ..api import api_manager
+from ..config import CircuitState
 from ..utils import get_current_time
 
 daily_news_api = on_alconna(
@@ -99,6 +100,24 @@ async def handle_daily_news_api(
         return
 
 
+def format_source_state(source: dict) -> str:
+    """格式化API源的启用和熔断状态"""
+    if not source["enabled"]:
+        return "❌"
+    if source["circuit_state"] == CircuitState.OPEN:
+        return f"⛔熔断{source['circuit_remaining']:.0f}s"
+    if source["circuit_state"] == CircuitState.HALF_OPEN:
+        return "🟡探测"
+    return "✅"
+
+
+def format_source_score(source: dict) -> str:
+    """格式化API源的实时评分"""
+    latency_text = f"{source['ewma_latency'] * 1000:.0f}ms" if source["ewma_latency"] > 0 else "未测"
+    rank_text = f"排名:{source['rank']}" if source["rank"] else "排名:-"
+    return f"{rank_text} {latency_text} {source['success_rate']:.0%}"
+
+
 async def handle_api_list(matcher: AlconnaMatcher, use_text: bool = False):
     """处理API源列表查看"""
     api_status = api_manager.get_api_status()
@@ -127,8 +146,7 @@ async def handle_api_list(matcher: AlconnaMatcher, use_text: bool = False):
 
                 line2 = ""
                 for source in row_sources:
-                    status_icon = "✅" if source["enabled"] else "❌"
-                    status_text = f"{status_icon} 优先级:{source['priority']}"
+                    status_text = f"{format_source_state(source)} 优先级:{source['priority']}"
                     line2 += f"{status_text:<22}"
                 message += line2.rstrip() + "\n"
 
@@ -151,6 +169,19 @@ async def handle_api_list(matcher: AlconnaMatcher, use_text: bool = False):
                     line3 += f"{combined_text:<22}"
                 message += line3.rstrip() + "\n"
 
+                line4 = ""
+                for source in row_sources:
+                    line4 += f"{format_source_score(source):<22}"
+                message += line4.rstrip() + "\n"
+
+                errors = [
+                    f"🔗{i} 最近错误:{source['last_error']}"
+                    for i, source in enumerate(row_sources, row_start + 1)
+                    if source["last_error"]
+                ]
+                if errors:
+                    message += "  ".join(errors) + "\n"
+
                 message += "\n"
 
             message += "\n"
@@ -167,16 +198,15 @@ async def handle_api_list(matcher: AlconnaMatcher, use_text: bool = False):
             for row_start in range(0, len(sources), 4):
                 row_sources = sources[row_start : row_start + 4]
 
-                md_text += "| API源 | 状态 & 优先级 | 成功时间 & 失败次数 |\n"
-                md_text += "|-------|---------------|--------------------|\n"
+                md_text += "| API源 | 状态 & 优先级 | 成功时间 & 失败次数 | 实时评分 |\n"
+                md_text += "|-------|---------------|--------------------|----------|\n"
 
                 for i, source in enumerate(row_sources, row_start + 1):
                     url_display = source["url"]
                     if len(url_display) > 25:
                         url_display = url_display[:22] + "..."
 
-                    status_emoji = "✅" if source["enabled"] else "❌"
-                    status_priority = f"{status_emoji} 优先级:{source['priority']}"
+                    status_priority = f"{format_source_state(source)} 优先级:{source['priority']}"
 
                     if source["last_success"] > 0:
                         import time
@@ -193,7 +223,11 @@ async def handle_api_list(matcher: AlconnaMatcher, use_text: bool = False):
                     fail_text = f"失败:{fail_icon}{source['failure_count']}"
                     success_fail = f"{success_text}<br>{fail_text}"
 
-                    md_text += f"| 🔗{i} {url_display} | {status_priority} | {success_fail} |\n"
+                    score_text = format_source_score(source).replace(" ", "<br>")
+                    if source["last_error"]:
+                        score_text += f"<br>最近错误:{source['last_error']}"
+
+                    md_text += f"| 🔗{i} {url_display} | {status_priority} | {success_fail} | {score_text} |\n"
 
                 md_text += "\n"
 
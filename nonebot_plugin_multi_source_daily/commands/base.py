@@ -6,7 +6,7 @@ from nonebot.adapters.onebot.v11 import (
 )
 from ..api import get_news_source, news_sources
 from ..config import Config
-from ..utils import generate_news_type_error
+from ..utils import generate_news_type_error, news_snapshot_store
 
 require("nonebot_plugin_alconna")
 from nonebot_plugin_alconna import (  # noqa: E402
@@ -93,7 +93,15 @@ async def handle_daily_news(
             format_type=format_type, force_refresh=force_refresh, api_index=api_index
         )
 
-        await matcher.send(message)
+        receipt = await matcher.send(message)
+        news_snapshot_store.record(
+            source.name,
+            source.get_displayed_items(message, format_type, api_index),
+            message_id=news_snapshot_store.get_message_id(receipt),
+            session_id=news_snapshot_store.get_session_id(
+                getattr(event, "group_id", None), event.user_id
+            ),
+        )
     except ValueError as e:
         await matcher.send(f"参数错误: {e}")
     except Exception as e:
@@ -1,6 +1,6 @@
 from nonebot import require
 from nonebot.permission import SUPERUSER
-from ..utils import news_cache
+from ..utils import news_cache, render_scheduler
 
 require("nonebot_plugin_alconna")
 from nonebot_plugin_alconna import (  # noqa: E402
@@ -47,8 +47,25 @@ async def handle_daily_news_cache(
     status = news_cache.get_status()
     detailed = news_cache.get_detailed_status()
 
+    stats = status["stats"]
+    render_status = render_scheduler.get_status()
+
     message = "【日报缓存状态】\n"
-    message += f"共有 {status['total']} 项缓存\n"
+    message += f"共有 {status['total']} 项缓存（上限 {status['max_entries']} 项）\n"
+    message += (
+        f"内存占用: {status['total_size'] / 1024 / 1024:.2f}MB / {status['max_size_mb']:.2f}MB\n"
+    )
+    message += (
+        f"命中 {stats['hits']} 次，陈旧命中 {stats['stale_hits']} 次，未命中 {stats['misses']} 次\n"
+    )
+    message += (
+        f"已淘汰 {stats['evictions']} 项，共释放 {stats['evicted_size'] / 1024 / 1024:.2f}MB\n"
+    )
+    message += (
+        f"渲染: 进行中 {render_status['running']}/{render_status['limit']}，"
+        f"排队 {render_status['waiting']}，最大排队 {render_status['max_queue_depth']}，"
+        f"已完成 {render_status['completed']}，平均等待 {render_status['avg_wait']:.2f}秒\n"
+    )
 
     if status["total"] > 0:
         message += "\n各类型缓存数量:\n"
@@ -57,9 +74,14 @@ async def handle_daily_news_cache(
 
         message += "\n详细缓存信息:\n"
         for item in detailed["details"]:
-            message += f"- {item['type']} ({item['format']}"
+            format_name = "原始数据" if item["format"] == news_cache.DATA_FORMAT else item["format"]
+            message += f"- {item['type']} ({format_name}"
             if "api_source" in item:
                 message += f", {item['api_source']}"
-            message += f"): 将在 {item['expires_in']}秒后过期\n"
+            message += f", {item['size'] / 1024:.1f}KB"
+            if item.get("stale"):
+                message += "): 已过期，下次请求时后台刷新\n"
+            else:
+                message += f"): 将在 {item['expires_in']}秒后过期\n"
 
     await matcher.send(message.strip())
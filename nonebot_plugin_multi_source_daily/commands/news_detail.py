@@ -7,7 +7,10 @@ from nonebot.adapters.onebot.v11 import (
 )
 from nonebot.plugin import on_message
 from nonebot.rule import Rule
-from ..api.handlers import get_news_handler
+from ..api.handlers import BaseNewsHandler, get_news_handler
+from ..config import RenderPriority
+from ..models import NewsItem, NewsSnapshot
+from ..utils import news_snapshot_store, render_priority
 from ..utils.screenshot import capture_webpage_screenshot
 require("nonebot_plugin_alconna")
 from nonebot_plugin_alconna import (  # noqa: E402
@@ -44,6 +47,13 @@ def reply_with_number_rule() -> Rule:
         if not event.reply:
             return False
 
+        text = event.get_plaintext().strip()
+        if not text.isdigit():
+            return False
+
+        if news_snapshot_store.get_by_message(event.reply.message_id):
+            return True
+
         reply_msg = event.reply.message
         has_image = False
         for seg in reply_msg:
@@ -51,11 +61,7 @@ def reply_with_number_rule() -> Rule:
                 has_image = True
                 break
 
-        if not has_image:
-            return False
-
-        text = event.get_plaintext().strip()
-        return text.isdigit()
+        return has_image
 
     return Rule(_rule)
 
@@ -64,6 +70,21 @@ def reply_with_number_rule() -> Rule:
 quote_detail = on_message(rule=reply_with_number_rule(), priority=5, block=True)
 
 
+def get_event_session_id(event: MessageEvent) -> str | None:
+    """获取事件所在会话的快照标识"""
+    return news_snapshot_store.get_session_id(getattr(event, "group_id", None), event.user_id)
+
+
+async def resolve_news_item(
+    handler: BaseNewsHandler, index: int, snapshot: NewsSnapshot | None = None
+) -> NewsItem | None:
+    """根据序号获取新闻项，有发送快照时直接使用用户看到的条目"""
+    if snapshot is not None:
+        logger.debug(f"从发送快照获取{snapshot.news_type}第{index}条新闻")
+        return snapshot.get_item(index)
+    return await handler.get_news_item_by_index(index)
+
+
 async def extract_news_type_from_reply(event: MessageEvent) -> str | None:
     """从回复消息中提取日报类型"""
     if not event.reply:
@@ -118,10 +139,12 @@ async def extract_news_type_from_reply(event: MessageEvent) -> str | None:
 
 @news_detail.handle()
 async def handle_news_detail(
+    event: MessageEvent,
     matcher: AlconnaMatcher,
     res: CommandResult,
 ):
     """处理日报详情命令"""
+    render_priority.set(RenderPriority.DETAIL)
     arp = res.result
 
     news_type = arp.all_matched_args.get("news_type")
@@ -136,7 +159,8 @@ async def handle_news_detail(
         await matcher.send(f"未找到{news_type}类型的日报处理器")
         return
 
-    news_item = await handler.get_news_item_by_index(index)
+    snapshot = news_snapshot_store.get_latest(get_event_session_id(event), handler.name)
+    news_item = await resolve_news_item(handler, index, snapshot)
     if not news_item:
         await matcher.send(f"未找到{news_type}日报的第{index}条新闻")
         return
@@ -171,13 +195,18 @@ async def handle_news_detail(
 @quote_detail.handle()
 async def handle_quote_detail(event: MessageEvent):
     """处理引用回复获取详情命令"""
+    render_priority.set(RenderPriority.DETAIL)
     text = event.get_plaintext().strip()
     try:
         index = int(text)
     except ValueError:
         return
 
-    news_type = await extract_news_type_from_reply(event)
+    snapshot = news_snapshot_store.get_by_message(event.reply.message_id) if event.reply else None
+    if snapshot is not None:
+        news_type = snapshot.news_type
+    else:
+        news_type = await extract_news_type_from_reply(event)
     if not news_type:
         return
 
@@ -185,7 +214,7 @@ async def handle_quote_detail(event: MessageEvent):
     if not handler:
         return
 
-    news_item = await handler.get_news_item_by_index(index)
+    news_item = await resolve_news_item(handler, index, snapshot)
     if not news_item:
         return
 
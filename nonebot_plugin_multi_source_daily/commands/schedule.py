@@ -138,14 +138,13 @@ async def handle_daily_news_set(
 
         if all_groups:
             group_list = await bot.get_group_list()
-            success_count = 0
-
-            for group in group_list:
-                try:
-                    await schedule_manager.add_job(group["group_id"], news_type, hour, minute, format_type)
-                    success_count += 1
-                except Exception as e:
-                    logger.error(f"为群 {group['group_id']} 设置定时任务失败: {e}")
+            success_count = await schedule_manager.add_jobs(
+                [group["group_id"] for group in group_list],
+                news_type,
+                hour,
+                minute,
+                format_type,
+            )
 
             await matcher.send(
                 f"已为所有群({success_count}/{len(group_list)}个)设置{news_type}日报，"
@@ -220,16 +219,8 @@ async def handle_daily_news_remove(
 
     try:
         if all_groups:
-            from ..utils.core import schedule_store
-
-            removed_count = 0
-            groups = schedule_store.get_all_groups_by_news_type(news_type)
-            for group_id in groups:
-                try:
-                    await schedule_manager.remove_job(int(group_id), news_type)
-                    removed_count += 1
-                except Exception as e:
-                    logger.error(f"为群 {group_id} 取消定时任务失败: {e}")
+            groups = schedule_manager.get_groups_by_news_type(news_type)
+            removed_count = await schedule_manager.remove_jobs(groups, news_type)
 
             await matcher.send(f"已取消所有群({removed_count}/{len(groups)}个)的{news_type}日报定时任务")
             return
@@ -287,10 +278,8 @@ async def handle_daily_news_view(
         current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         if all_groups:
-            from ..utils.core import schedule_store
-
-            all_schedules = schedule_store.get_all_schedules()
-            if not all_schedules:
+            all_jobs = schedule_manager.get_jobs()
+            if not all_jobs:
                 await matcher.send("当前没有任何群组订阅日报")
                 return
 
@@ -300,35 +289,24 @@ async def handle_daily_news_view(
                 "groups": [],
             }
 
-            for group_id, schedules in all_schedules.items():
+            jobs_by_group: dict[int, list[dict]] = {}
+            for job in all_jobs:
+                jobs_by_group.setdefault(job["group_id"], []).append(job)
+
+            for group_id, jobs in jobs_by_group.items():
                 try:
-                    group_info = await bot.get_group_info(group_id=int(group_id))
+                    group_info = await bot.get_group_info(group_id=group_id)
                     group_name = group_info.get("group_name", f"群 {group_id}")
                 except Exception:
                     group_name = f"群 {group_id}"
 
-                group_data = {
-                    "group_id": group_id,
-                    "group_name": group_name,
-                    "jobs": [],
-                }
-
-                for news_type, schedule in schedules.items():
-                    source = get_news_source(news_type)
-                    news_description = source.description if source else "未知日报类型"
-                    schedule_time = schedule.get("schedule_time", "未知时间")
-                    format_type = schedule.get("format_type", "image")
-
-                    group_data["jobs"].append(
-                        {
-                            "news_type": news_type,
-                            "news_description": news_description,
-                            "schedule_time": schedule_time,
-                            "format_type": format_type,
-                        }
-                    )
-
-                html_data["groups"].append(group_data)
+                html_data["groups"].append(
+                    {
+                        "group_id": group_id,
+                        "group_name": group_name,
+                        "jobs": jobs,
+                    }
+                )
 
             md_text = f"# 📊 {html_data['title']}\n\n"
             md_text += f"**查询时间**: {html_data['current_time']}\n\n"
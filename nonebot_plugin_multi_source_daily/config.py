@@ -78,6 +78,22 @@ class CacheConfig:
     CLEANUP_INTERVAL = 6 * 3600
 
 
+class RenderPriority:
+    """渲染优先级，数值越小越先执行"""
+
+    SCHEDULED = 0
+    COMMAND = 1
+    DETAIL = 2
+
+
+class CircuitState:
+    """API源熔断器状态"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
 class UserAgentConfig:
     """用户代理配置"""
 
@@ -170,7 +186,41 @@ class Config(BaseModel):
     daily_news_max_retries: int = 3
     daily_news_timeout: float = 10.0
     daily_news_cache_expire: int = 3600
+    daily_news_cache_stale_ttl: int = 600
+    daily_news_cache_max_entries: int = 100
+    daily_news_cache_max_size_mb: float = 64.0
+    daily_news_cache_persist: bool = True
+    daily_news_snapshot_expire: int = 86400
+    daily_news_snapshot_max_entries: int = 1000
+    daily_news_render_page_pool_size: int = 2
+    daily_news_render_concurrency: int = 3
+    daily_news_render_cache: bool = True
+    daily_news_prewarm_minutes: int = 3
+    daily_news_send_rate: float = 2.0
+    daily_news_send_jitter: float = 0.0
+    daily_news_send_concurrency: int = 2
+    daily_news_send_retries: int = 2
+    daily_news_image_send_mode: str = "base64"
+    daily_news_image_base_url: str = ""
+    daily_news_storage_save_delay: float = 1.0
+    daily_news_storage_backend: str = "json"
     daily_news_auto_failover: bool = True
+    daily_news_hedge_types: list[str] = ["60秒", "微博热搜"]
+    daily_news_hedge_default_delay: float = 3.0
+    daily_news_adaptive_ranking: bool = True
+    daily_news_circuit_threshold: int = 3
+    daily_news_circuit_cooldown: float = 300.0
+    daily_news_probe_interval: int = 30
+
+    daily_news_http_max_connections: int = 20
+    daily_news_http_max_keepalive_connections: int = 10
+    daily_news_http_keepalive_expiry: float = 30.0
+    daily_news_http2: bool = False
+    daily_news_host_default_rate: float = 5.0
+    daily_news_host_default_concurrency: int = 4
+    daily_news_host_rate_limits: dict[str, float] = {}
+    daily_news_host_concurrency_limits: dict[str, int] = {}
+    daily_news_host_max_defer: float = 300.0
 
     daily_news_default_format: str = "image"
     daily_news_supported_formats: list[str] = ["image", "text"]
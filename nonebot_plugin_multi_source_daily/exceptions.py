@@ -57,6 +57,38 @@ class APIResponseParseException(APIException):
         self.parser = parser
 
 
+class APICircuitOpenException(APIException):
+    """API源熔断中异常"""
+
+    def __init__(
+        self,
+        message: str = "API源熔断中",
+        api_url: str | None = None,
+        retry_after: float | None = None,
+    ):
+        error_msg = message
+        if retry_after:
+            error_msg += f"，{retry_after:.0f}秒后重试"
+        super().__init__(error_msg, api_url=api_url)
+        self.retry_after = retry_after
+
+
+class APIHostDeferredException(APIException):
+    """API主机要求暂停请求异常"""
+
+    def __init__(
+        self,
+        message: str = "API主机要求暂停请求",
+        api_url: str | None = None,
+        retry_after: float | None = None,
+    ):
+        error_msg = message
+        if retry_after:
+            error_msg += f"，{retry_after:.0f}秒后重试"
+        super().__init__(error_msg, api_url=api_url)
+        self.retry_after = retry_after
+
+
 class NoAvailableAPIException(APIException):
     """没有可用的API异常"""
 
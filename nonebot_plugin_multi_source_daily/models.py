@@ -1,5 +1,5 @@
 from collections.abc import Awaitable, Callable
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from typing import Any, Protocol
 
@@ -50,6 +50,10 @@ class NewsData:
         """添加新闻项"""
         self.items.append(item)
 
+    def copy(self) -> "NewsData":
+        """复制数据集合，条目列表和条目本身互不影响"""
+        return replace(self, items=[replace(item) for item in self.items])
+
     def to_dict(self) -> dict[str, Any]:
         """转为字典"""
         return {
@@ -60,6 +64,16 @@ class NewsData:
             "has_binary_data": self.binary_data is not None,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "NewsData":
+        """从字典创建，不包含二进制数据"""
+        return cls(
+            title=data.get("title", ""),
+            items=[NewsItem(**item) for item in data.get("items", [])],
+            update_time=data.get("update_time", ""),
+            source=data.get("source", ""),
+        )
+
 
 @dataclass
 class ApiSource:
@@ -71,6 +85,11 @@ class ApiSource:
     enabled: bool = True
     last_success: float = 0
     failure_count: int = 0
+    ewma_latency: float = 0
+    success_rate: float = 1.0
+    last_error: str = ""
+    circuit_state: str = "closed"
+    circuit_opened_at: float = 0
 
     def to_dict(self) -> dict[str, Any]:
         """转为字典"""
@@ -81,8 +100,20 @@ class ApiSource:
             "enabled": self.enabled,
             "last_success": self.last_success,
             "failure_count": self.failure_count,
+            "ewma_latency": self.ewma_latency,
+            "success_rate": self.success_rate,
+            "last_error": self.last_error,
+            "circuit_state": self.circuit_state,
+            "circuit_opened_at": self.circuit_opened_at,
         }
 
+    def expected_latency(self) -> float | None:
+        """预计获得有效响应的耗时，未测量过的源返回None"""
+        if self.ewma_latency <= 0:
+            return None
+        # 失败后需要重新请求，按成功率折算期望耗时
+        return self.ewma_latency / max(self.success_rate, 0.05)
+
 
 class NewsSourceProtocol(Protocol):
     """日报源协议"""
@@ -143,20 +174,52 @@ class ScheduleConfig:
 class CacheItem:
     """缓存项"""
 
-    data: Message
+    data: Message | NewsData
     expire_time: float
     created_at: float = field(default_factory=lambda: datetime.now().timestamp())
+    hard_expire_time: float = 0
+    size: int = 0
+    items: list[NewsItem] | None = None
 
     def is_expired(self) -> bool:
         """检查是否过期"""
         return datetime.now().timestamp() > self.expire_time
 
+    def is_hard_expired(self) -> bool:
+        """检查是否超过可陈旧返回的最终过期时间"""
+        return datetime.now().timestamp() > max(self.expire_time, self.hard_expire_time)
+
     def time_to_expire(self) -> float:
         """获取剩余过期时间（秒）"""
         now = datetime.now().timestamp()
         return max(0, self.expire_time - now)
 
 
+@dataclass
+class NewsSnapshot:
+    """已发送列表的快照，用于按序号查询详情"""
+
+    news_type: str
+    items: list[NewsItem]
+    expire_time: float
+    created_at: float = field(default_factory=lambda: datetime.now().timestamp())
+    index_map: dict[int, NewsItem] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        """按显示序号建立索引"""
+        self.index_map = {}
+        for position, item in enumerate(self.items, 1):
+            self.index_map.setdefault(item.index or position, item)
+
+    def is_expired(self) -> bool:
+        """检查是否过期"""
+        return datetime.now().timestamp() > self.expire_time
+
+    def get_item(self, index: int) -> NewsItem | None:
+        """根据显示序号获取新闻项"""
+        return self.index_map.get(index)
+
+
 @dataclass
 class ApiStatus:
     """API状态"""
@@ -1,12 +1,18 @@
 from .cache import (
     NewsCache,
     news_cache,
+    news_cache_store,
+    NewsSnapshotStore,
+    news_snapshot_store,
     FileCache,
     screenshot_cache,
     weibo_screenshot_cache,
     news_data_cache,
     api_response_cache,
+    render_cache,
+    image_outbox_store,
 )
+from .concurrency import SingleFlight, TokenBucket
 from .core import (
     fetch_with_retry,
     format_time,
@@ -14,6 +20,8 @@ from .core import (
     get_current_time,
     get_today_date,
     parse_time,
+    percentile,
+    render_news_to_fit,
     render_news_to_image,
     validate_time,
     BaseStorage,
@@ -22,7 +30,35 @@ from .core import (
     schedule_store,
     api_status_store,
 )
-from .scheduler import ScheduleManager, schedule_manager
+from .storage import (
+    SqliteDatabase,
+    SqliteScheduleStorage,
+    SqliteApiStatusStorage,
+)
+from .dispatcher import SendDispatcher, send_dispatcher
+from .http import (
+    HttpClientManager,
+    http_client_manager,
+    get_http_client,
+    HostLimiter,
+    host_limiter,
+    parse_retry_after,
+    ValidatorCache,
+    validator_cache,
+)
+from .outbox import ImageOutbox, image_outbox
+from .render import (
+    RenderPagePool,
+    RenderScheduler,
+    RenderSizeEstimator,
+    build_render_cache_key,
+    get_template_env,
+    render_page_pool,
+    render_priority,
+    render_scheduler,
+    render_size_estimator,
+)
+from .scheduler import JobRegistry, ScheduleManager, schedule_manager
 from .screenshot import (
     capture_webpage_screenshot,
     optimize_image,
@@ -40,17 +76,26 @@ from .weibo import (
 __all__ = [
     "NewsCache",
     "news_cache",
+    "news_cache_store",
+    "NewsSnapshotStore",
+    "news_snapshot_store",
     "FileCache",
     "screenshot_cache",
     "weibo_screenshot_cache",
     "news_data_cache",
     "api_response_cache",
+    "render_cache",
+    "image_outbox_store",
+    "SingleFlight",
+    "TokenBucket",
     "fetch_with_retry",
     "format_time",
     "generate_news_type_error",
     "get_current_time",
     "get_today_date",
     "parse_time",
+    "percentile",
+    "render_news_to_fit",
     "render_news_to_image",
     "validate_time",
     "BaseStorage",
@@ -58,6 +103,31 @@ __all__ = [
     "ApiStatusStorage",
     "schedule_store",
     "api_status_store",
+    "SqliteDatabase",
+    "SqliteScheduleStorage",
+    "SqliteApiStatusStorage",
+    "SendDispatcher",
+    "send_dispatcher",
+    "HttpClientManager",
+    "http_client_manager",
+    "get_http_client",
+    "HostLimiter",
+    "host_limiter",
+    "parse_retry_after",
+    "ValidatorCache",
+    "validator_cache",
+    "ImageOutbox",
+    "image_outbox",
+    "RenderPagePool",
+    "RenderScheduler",
+    "RenderSizeEstimator",
+    "build_render_cache_key",
+    "get_template_env",
+    "render_page_pool",
+    "render_priority",
+    "render_scheduler",
+    "render_size_estimator",
+    "JobRegistry",
     "ScheduleManager",
     "schedule_manager",
     "capture_webpage_screenshot",
@@ -1,23 +1,99 @@
+import asyncio
+import base64
 import hashlib
+import json
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Optional
 from datetime import datetime, timedelta
 
 from nonebot import logger, get_plugin_config
-from nonebot.adapters.onebot.v11 import Message
+from nonebot.adapters.onebot.v11 import Message, MessageSegment
 
 from ..config import config, Config
-from ..models import CacheItem
+from ..models import CacheItem, NewsData, NewsItem, NewsSnapshot
 
 
 class NewsCache:
-    """新闻缓存管理类"""
+    """新闻缓存管理类
 
-    def __init__(self, expire_time: int = None):
-        """初始化缓存管理器"""
-        self.cache: dict[str, CacheItem] = {}
+    同时缓存渲染后的消息和解析后的原始数据，原始数据使用 DATA_FORMAT 作为格式键，
+    供不同格式的生成和详情查询复用。
+    """
+
+    DATA_FORMAT = "data"
+
+    def __init__(self, expire_time: int = None, persist_store: "FileCache | None" = None):
+        """初始化缓存管理器
+
+        Args:
+            expire_time: 默认过期时间（秒）
+            persist_store: 持久化缓存使用的文件缓存，为空时仅使用内存
+        """
+        self.cache: OrderedDict[str, CacheItem] = OrderedDict()
+        self.persist_store = persist_store
+        self._persist_executor: ThreadPoolExecutor | None = None
         self.default_expire_time = expire_time or config.daily_news_cache_expire
+        self.total_size = 0
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "evicted_size": 0,
+        }
+
+    @staticmethod
+    def estimate_size(data: Message | NewsData) -> int:
+        """估算缓存数据占用的字节数，图片段按 base64 字符串长度计算"""
+        size = 0
+        if isinstance(data, NewsData):
+            size += len(data.binary_data or b"")
+            for item in data.items:
+                size += sum(len(value) for value in item.to_dict().values() if isinstance(value, str))
+            return size
+
+        for segment in data:
+            for value in segment.data.values():
+                if isinstance(value, (str, bytes, bytearray)):
+                    size += len(value)
+        return size
+
+    def _remove(self, key: str) -> CacheItem | None:
+        """移除缓存项并更新占用统计"""
+        cache_item = self.cache.pop(key, None)
+        if cache_item is not None:
+            self.total_size -= cache_item.size
+        return cache_item
+
+    def _store(self, key: str, cache_item: CacheItem) -> bool:
+        """写入内存缓存，超出限制时淘汰旧数据"""
+        plugin_config = get_plugin_config(Config)
+        max_entries = max(1, plugin_config.daily_news_cache_max_entries)
+        max_size = int(plugin_config.daily_news_cache_max_size_mb * 1024 * 1024)
+
+        self._remove(key)
+        if cache_item.size > max_size:
+            logger.warning(
+                f"{key} 的数据过大 ({cache_item.size / 1024 / 1024:.2f}MB)，超过缓存容量上限，不进行缓存"
+            )
+            return False
+
+        self.cache[key] = cache_item
+        self.total_size += cache_item.size
+        self._evict(max_entries, max_size)
+        return True
+
+    def _evict(self, max_entries: int, max_size: int) -> None:
+        """按最近最少使用顺序淘汰缓存，直到满足数量和大小限制"""
+        while self.cache and (len(self.cache) > max_entries or self.total_size > max_size):
+            key, cache_item = self.cache.popitem(last=False)
+            self.total_size -= cache_item.size
+            self.stats["evictions"] += 1
+            self.stats["evicted_size"] += cache_item.size
+            logger.debug(f"缓存超出限制，已淘汰: {key} ({cache_item.size / 1024:.1f}KB)")
 
     def get_cache_key(self, news_type: str, format_type: str, api_index: int = None) -> str:
         """生成缓存键"""
@@ -26,16 +102,51 @@ class NewsCache:
         return f"{news_type}:{format_type}"
 
     def get(self, news_type: str, format_type: str, api_index: int = None) -> Message | None:
-        """获取缓存"""
+        """获取缓存，只返回未过期的数据"""
+        data, is_stale = self.lookup(news_type, format_type, api_index)
+        if is_stale:
+            return None
+        return data
+
+    def lookup(self, news_type: str, format_type: str, api_index: int = None) -> tuple[Message | None, bool]:
+        """获取缓存及其是否已陈旧
+
+        超过过期时间但未超过陈旧容忍时间的缓存仍会返回，并标记为陈旧，
+        由调用方决定是否在后台刷新。
+        """
         key = self.get_cache_key(news_type, format_type, api_index)
-        if key in self.cache:
-            cache_item = self.cache[key]
+        cache_item = self.cache.get(key)
+        if cache_item is None:
+            self.stats["misses"] += 1
+            return None, False
+
+        if not cache_item.is_hard_expired():
+            self.cache.move_to_end(key)
             if not cache_item.is_expired():
-                return cache_item.data
-            else:
-                del self.cache[key]
-                logger.debug(f"缓存已过期并被清理: {key}")
-        return None
+                self.stats["hits"] += 1
+                return cache_item.data, False
+            self.stats["stale_hits"] += 1
+            return cache_item.data, True
+
+        self._remove(key)
+        self.stats["misses"] += 1
+        logger.debug(f"缓存已过期并被清理: {key}")
+        return None, False
+
+    async def restore(self, news_type: str, format_type: str, api_index: int = None) -> bool:
+        """内存中没有缓存时从持久化缓存恢复，在持久化线程中读取，不阻塞事件循环"""
+        key = self.get_cache_key(news_type, format_type, api_index)
+        if key in self.cache or not self._is_persist_enabled():
+            return False
+
+        loop = asyncio.get_running_loop()
+        cache_item = await loop.run_in_executor(self._get_persist_executor(), self._load_persisted, key)
+        # 读取期间可能已经写入了新的缓存
+        if cache_item is None or key in self.cache or not self._store(key, cache_item):
+            return False
+
+        logger.debug(f"已从持久化缓存恢复: {key}")
+        return True
 
     def set(
         self,
@@ -44,25 +155,74 @@ class NewsCache:
         data: Message,
         expire_time: int | None = None,
         api_index: int = None,
+        items: list[NewsItem] | None = None,
     ) -> None:
-        """设置缓存"""
+        """设置缓存
+
+        Args:
+            items: 消息中实际展示的新闻条目，用于记录发送快照
+        """
         key = self.get_cache_key(news_type, format_type, api_index)
         expire_seconds = expire_time or self.default_expire_time
         expire_timestamp = time.time() + expire_seconds
+        stale_ttl = max(0, get_plugin_config(Config).daily_news_cache_stale_ttl)
+        size = self.estimate_size(data)
 
-        self.cache[key] = CacheItem(
+        cache_item = CacheItem(
             data=data,
             expire_time=expire_timestamp,
             created_at=time.time(),
+            hard_expire_time=expire_timestamp + stale_ttl,
+            size=size,
+            items=items,
+        )
+        if not self._store(key, cache_item):
+            return
+
+        self._persist(key, cache_item)
+
+        logger.debug(
+            f"已缓存 {key} 的数据，大小: {size / 1024:.1f}KB，过期时间: {expire_seconds}秒，陈旧容忍: {stale_ttl}秒"
         )
 
-        logger.debug(f"已缓存 {key} 的数据，过期时间: {expire_seconds}秒")
+    def get_items(
+        self, news_type: str, format_type: str, api_index: int = None, message: Message | None = None
+    ) -> list[NewsItem] | None:
+        """获取缓存消息中实际展示的新闻条目
+
+        Args:
+            message: 指定时只在缓存的正是这条消息时返回，避免错误提示等消息对应到旧的条目
+        """
+        key = self.get_cache_key(news_type, format_type, api_index)
+        cache_item = self.cache.get(key)
+        if cache_item is None or cache_item.is_hard_expired():
+            return None
+        if message is not None and cache_item.data is not message:
+            return None
+        return cache_item.items
+
+    def get_data(self, news_type: str, api_index: int = None) -> NewsData | None:
+        """获取未过期的原始数据缓存，返回副本"""
+        data = self.get(news_type, self.DATA_FORMAT, api_index)
+        if data is None:
+            return None
+        return data.copy()
+
+    def set_data(
+        self,
+        news_type: str,
+        data: NewsData,
+        expire_time: int | None = None,
+        api_index: int = None,
+    ) -> None:
+        """缓存原始数据，保存副本以免被调用方修改"""
+        self.set(news_type, self.DATA_FORMAT, data.copy(), expire_time=expire_time, api_index=api_index)
 
     def delete(self, news_type: str, format_type: str, api_index: int = None) -> bool:
         """删除指定缓存"""
         key = self.get_cache_key(news_type, format_type, api_index)
-        if key in self.cache:
-            del self.cache[key]
+        self._delete_persisted(key)
+        if self._remove(key) is not None:
             logger.debug(f"已删除缓存: {key}")
             return True
         return False
@@ -77,7 +237,8 @@ class NewsCache:
                 keys_to_delete.append(key)
 
         for key in keys_to_delete:
-            del self.cache[key]
+            self._remove(key)
+            self._delete_persisted(key)
             count += 1
 
         if count > 0:
@@ -89,6 +250,9 @@ class NewsCache:
         """清空所有缓存"""
         count = len(self.cache)
         self.cache.clear()
+        self.total_size = 0
+        if self.persist_store is not None:
+            self._run_persist_task(self.persist_store.clear_all)
         logger.debug(f"已清空所有缓存，共 {count} 项")
         return count
 
@@ -98,18 +262,132 @@ class NewsCache:
         keys_to_delete = []
 
         for key, item in self.cache.items():
-            if item.is_expired():
+            if item.is_hard_expired():
                 keys_to_delete.append(key)
 
         for key in keys_to_delete:
-            del self.cache[key]
+            self._remove(key)
+            self._delete_persisted(key)
             count += 1
 
+        if self.persist_store is not None:
+            self._run_persist_task(self.persist_store.cleanup_expired)
+
         if count > 0:
             logger.debug(f"已清理 {count} 项过期缓存")
 
         return count
 
+    def _is_persist_enabled(self) -> bool:
+        """检查是否启用持久化缓存"""
+        return self.persist_store is not None and get_plugin_config(Config).daily_news_cache_persist
+
+    def _get_persist_executor(self) -> ThreadPoolExecutor:
+        """获取持久化线程，单线程保证读取、写入和删除的顺序"""
+        if self._persist_executor is None:
+            self._persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="news_cache")
+        return self._persist_executor
+
+    def _run_persist_task(self, func, *args) -> None:
+        """在后台线程中执行持久化操作"""
+        executor = self._get_persist_executor()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            executor.submit(func, *args).result()
+            return
+
+        loop.run_in_executor(executor, func, *args)
+
+    def _dump_item(self, key: str, cache_item: CacheItem) -> bytes:
+        """序列化缓存项"""
+        payload = {
+            "key": key,
+            "expire_time": cache_item.expire_time,
+            "hard_expire_time": cache_item.hard_expire_time,
+            "created_at": cache_item.created_at,
+        }
+        if isinstance(cache_item.data, NewsData):
+            news_data = cache_item.data
+            payload["news_data"] = news_data.to_dict()
+            if news_data.binary_data:
+                payload["news_data"]["binary_data"] = base64.b64encode(news_data.binary_data).decode()
+        else:
+            payload["segments"] = [{"type": segment.type, "data": segment.data} for segment in cache_item.data]
+        if cache_item.items is not None:
+            payload["items"] = [item.to_dict() for item in cache_item.items]
+        return json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+
+    def _persist(self, key: str, cache_item: CacheItem) -> None:
+        """将缓存项写入持久化缓存"""
+        if not self._is_persist_enabled():
+            return
+
+        try:
+            payload = self._dump_item(key, cache_item)
+        except Exception as e:
+            logger.warning(f"序列化缓存失败: {key}, {e}")
+            return
+
+        self._run_persist_task(self.persist_store.set, key, payload, "json")
+
+    def _delete_persisted(self, key: str) -> None:
+        """删除持久化缓存项"""
+        if self.persist_store is not None:
+            self._run_persist_task(self.persist_store.delete, key, "json")
+
+    def _load_persisted(self, key: str) -> CacheItem | None:
+        """从持久化缓存中读取缓存项，已过期或损坏的数据会被删除
+
+        在持久化线程中执行，直接删除文件而不再提交持久化任务。
+        """
+        if not self._is_persist_enabled():
+            return None
+
+        raw = self.persist_store.get(key, "json")
+        if not raw:
+            return None
+
+        try:
+            payload = json.loads(raw)
+            if payload.get("key") != key:
+                return None
+
+            if "news_data" in payload:
+                data = NewsData.from_dict(payload["news_data"])
+                binary_data = payload["news_data"].get("binary_data")
+                if binary_data:
+                    data.binary_data = base64.b64decode(binary_data)
+            else:
+                data = Message(
+                    MessageSegment(type=segment["type"], data=segment["data"])
+                    for segment in payload["segments"]
+                )
+            cache_item = CacheItem(
+                data=data,
+                expire_time=payload["expire_time"],
+                created_at=payload["created_at"],
+                hard_expire_time=payload.get("hard_expire_time", 0),
+                size=self.estimate_size(data),
+                items=[NewsItem(**item) for item in payload["items"]] if "items" in payload else None,
+            )
+        except Exception as e:
+            logger.warning(f"读取持久化缓存失败: {key}, {e}")
+            self.persist_store.delete(key, "json")
+            return None
+
+        if cache_item.is_hard_expired():
+            self.persist_store.delete(key, "json")
+            return None
+
+        return cache_item
+
+    def close(self) -> None:
+        """等待所有持久化操作完成"""
+        if self._persist_executor is not None:
+            self._persist_executor.shutdown(wait=True)
+            self._persist_executor = None
+
     def get_status(self) -> dict[str, Any]:
         """获取缓存状态"""
         types = {}
@@ -119,9 +397,15 @@ class NewsCache:
                 types[news_type] = 0
             types[news_type] += 1
 
+        plugin_config = get_plugin_config(Config)
+
         return {
             "total": len(self.cache),
             "types": types,
+            "total_size": self.total_size,
+            "max_entries": plugin_config.daily_news_cache_max_entries,
+            "max_size_mb": plugin_config.daily_news_cache_max_size_mb,
+            "stats": dict(self.stats),
         }
 
     def get_detailed_status(self) -> dict[str, Any]:
@@ -139,6 +423,8 @@ class NewsCache:
                 "format": format_type,
                 "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(item.created_at)),
                 "expires_in": int(item.time_to_expire()),
+                "stale": item.is_expired(),
+                "size": item.size,
             }
 
             if api_info:
@@ -152,7 +438,129 @@ class NewsCache:
         }
 
 
-news_cache = NewsCache()
+
+class NewsSnapshotStore:
+    """已发送列表快照存储
+
+    按消息ID和会话+日报类型记录每次发送的条目列表，
+    详情查询直接按序号取出用户看到的那一条，无需再次请求API。
+    群发时各群的索引指向同一个快照，不重复复制条目列表。
+    """
+
+    KEYS_PER_SEND = 2
+
+    def __init__(self):
+        """初始化快照存储"""
+        self.snapshots: OrderedDict[str, NewsSnapshot] = OrderedDict()
+        self._reserved: dict[str, int] = {}
+
+    @property
+    def max_entries(self) -> int:
+        """索引数量上限，为配置值加上各日报类型群发所需的数量"""
+        configured = max(0, get_plugin_config(Config).daily_news_snapshot_max_entries)
+        return configured + sum(self._reserved.values())
+
+    def reserve(self, news_type: str, group_count: int) -> None:
+        """按群发的群数为日报类型预留索引，避免同一轮群发中较早的群被淘汰"""
+        self._reserved[news_type] = max(self._reserved.get(news_type, 0), group_count * self.KEYS_PER_SEND)
+
+    @staticmethod
+    def get_message_id(receipt: Any) -> int | None:
+        """从发送消息的返回值中取出消息ID"""
+        if isinstance(receipt, dict):
+            return receipt.get("message_id")
+        return None
+
+    @staticmethod
+    def get_session_id(group_id: int | None = None, user_id: int | None = None) -> str | None:
+        """生成会话标识，群聊按群号，私聊按用户"""
+        if group_id is not None:
+            return f"group_{group_id}"
+        if user_id is not None:
+            return f"private_{user_id}"
+        return None
+
+    def _put(self, key: str, snapshot: NewsSnapshot) -> None:
+        """写入快照，超出数量上限时淘汰最早的快照"""
+        self.snapshots.pop(key, None)
+        self.snapshots[key] = snapshot
+        max_entries = self.max_entries
+        while len(self.snapshots) > max_entries:
+            self.snapshots.popitem(last=False)
+
+    def _get(self, key: str) -> NewsSnapshot | None:
+        """读取未过期的快照"""
+        snapshot = self.snapshots.get(key)
+        if snapshot is None:
+            return None
+        if snapshot.is_expired():
+            del self.snapshots[key]
+            return None
+        return snapshot
+
+    def create(self, news_type: str, items: list[NewsItem] | None) -> NewsSnapshot | None:
+        """创建快照，需调用 attach 关联到已发送的消息"""
+        if not items:
+            return None
+
+        expire_seconds = get_plugin_config(Config).daily_news_snapshot_expire
+        return NewsSnapshot(
+            news_type=news_type,
+            items=list(items),
+            expire_time=time.time() + expire_seconds,
+        )
+
+    def attach(
+        self,
+        snapshot: NewsSnapshot | None,
+        message_id: int | str | None = None,
+        session_id: str | None = None,
+    ) -> None:
+        """将快照关联到消息ID和会话"""
+        if snapshot is None:
+            return
+
+        if message_id is not None:
+            self._put(f"msg:{message_id}", snapshot)
+        if session_id is not None:
+            self._put(f"session:{session_id}:{snapshot.news_type}", snapshot)
+
+        logger.debug(
+            f"已记录{snapshot.news_type}发送快照，共 {len(snapshot.items)} 条，"
+            f"消息ID: {message_id}，会话: {session_id}"
+        )
+
+    def record(
+        self,
+        news_type: str,
+        items: list[NewsItem] | None,
+        message_id: int | str | None = None,
+        session_id: str | None = None,
+    ) -> NewsSnapshot | None:
+        """记录一次发送的条目列表"""
+        if message_id is None and session_id is None:
+            return None
+
+        snapshot = self.create(news_type, items)
+        self.attach(snapshot, message_id=message_id, session_id=session_id)
+        return snapshot
+
+    def get_by_message(self, message_id: int | str) -> NewsSnapshot | None:
+        """根据消息ID获取快照"""
+        return self._get(f"msg:{message_id}")
+
+    def get_latest(self, session_id: str | None, news_type: str) -> NewsSnapshot | None:
+        """获取会话中最近一次发送的指定类型快照"""
+        if session_id is None:
+            return None
+        return self._get(f"session:{session_id}:{news_type}")
+
+    def clear_expired(self) -> int:
+        """清理过期快照"""
+        keys_to_delete = [key for key, snapshot in self.snapshots.items() if snapshot.is_expired()]
+        for key in keys_to_delete:
+            del self.snapshots[key]
+        return len(keys_to_delete)
 
 
 class FileCache:
@@ -237,6 +645,10 @@ class FileCache:
             logger.warning(f"保存到缓存失败: {e}")
             return False
 
+    def get_file_path(self, key: str, extension: str = "cache") -> Path:
+        """获取缓存键对应的文件路径"""
+        return self._get_cache_file_path(self._get_cache_key(key), extension)
+
     def delete(self, key: str, extension: str = "cache") -> bool:
         """删除指定缓存"""
         try:
@@ -361,3 +773,9 @@ screenshot_cache = FileCache("screenshots", expire_hours=24)
 weibo_screenshot_cache = FileCache("weibo_screenshots", expire_hours=24)
 news_data_cache = FileCache("news_data", expire_hours=1)
 api_response_cache = FileCache("api_responses", expire_hours=6)
+news_cache_store = FileCache("news_cache", expire_hours=24)
+render_cache = FileCache("renders", expire_hours=24)
+image_outbox_store = FileCache("outbox", expire_hours=24)
+
+news_cache = NewsCache(persist_store=news_cache_store)
+news_snapshot_store = NewsSnapshotStore()
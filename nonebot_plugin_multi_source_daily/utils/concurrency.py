@@ -0,0 +1,90 @@
+"""并发控制工具模块"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+from nonebot import logger
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """请求合并工具
+
+    相同键的并发调用只执行一次，其余调用者等待同一个结果。
+    """
+
+    def __init__(self, name: str = "default"):
+        """初始化请求合并工具"""
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def is_running(self, key: Hashable) -> bool:
+        """检查指定键是否有正在进行的调用"""
+        return key in self._calls
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """执行或加入指定键的调用"""
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._release(key, done))
+        else:
+            logger.debug(f"[{self.name}] 合并并发请求: {key}")
+
+        # 单个调用者被取消时不影响其他等待者
+        return await asyncio.shield(future)
+
+    def _release(self, key: Hashable, future: asyncio.Future) -> None:
+        """调用结束后移除记录"""
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+    def get_status(self) -> dict[str, Any]:
+        """获取正在进行的调用信息"""
+        return {
+            "name": self.name,
+            "in_flight": len(self._calls),
+            "keys": [str(key) for key in self._calls],
+        }
+
+
+class TokenBucket:
+    """令牌桶限速器
+
+    按固定速率补充令牌，桶容量决定允许的突发数量；令牌不足时按到达顺序等待。
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        """初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量，默认为每秒令牌数且至少为1
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """按经过的时间补充令牌"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """获取令牌，返回等待的秒数"""
+        async with self._lock:
+            self._refill()
+            waited = 0.0
+            if self._tokens < tokens:
+                waited = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(waited)
+                self._refill()
+            self._tokens -= tokens
+            return waited
@@ -2,28 +2,44 @@
 
 import asyncio
 import json
+import os
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, TypeVar, Generic
 
 import httpx
-from nonebot import logger, require
+from nonebot import logger, get_plugin_config
 
 from .. import HAS_HTMLRENDER
 
 if HAS_HTMLRENDER:
     from nonebot_plugin_htmlrender import template_to_pic
 
-require("nonebot_plugin_localstore")
-import nonebot_plugin_localstore as store
-
-from ..config import config
+from ..config import config, Config
 from ..exceptions import (
     APIException,
+    APIHostDeferredException,
     APITimeoutException,
     InvalidTimeFormatException,
 )
+from .http import get_http_client, host_limiter, parse_retry_after, validator_cache
+from .storage import (
+    SqliteApiStatusStorage,
+    SqliteDatabase,
+    SqliteScheduleStorage,
+    get_storage_dir,
+)
+from .cache import render_cache
+from .render import (
+    build_render_cache_key,
+    render_page_pool,
+    render_scheduler,
+    render_size_estimator,
+)
+from .screenshot import optimize_image
 
 T = TypeVar("T")
 
@@ -34,9 +50,14 @@ async def fetch_with_retry(
     timeout: float = None,
     headers: dict[str, str] = None,
     params: dict[str, Any] = None,
+    conditional: bool = False,
 ) -> httpx.Response:
-    """带重试的HTTP请求"""
-    max_retries = max_retries or config.daily_news_max_retries
+    """带重试的HTTP请求
+
+    conditional 为 True 时发送并记录响应的 ETag/Last-Modified，
+    内容未变化时返回状态码为304的响应，调用方需复用上次的结果。
+    """
+    max_retries = config.daily_news_max_retries if max_retries is None else max_retries
     timeout_seconds = timeout or config.daily_news_timeout
 
     retries = 0
@@ -50,41 +71,58 @@ async def fetch_with_retry(
     if headers:
         default_headers.update(headers)
 
+    if conditional:
+        default_headers.update(validator_cache.get_headers(url, params))
+
+    client = get_http_client()
+
     while retries <= max_retries:
         try:
-            async with httpx.AsyncClient(timeout=timeout_seconds) as client:
+            async with host_limiter.limit(url):
                 response = await client.get(
                     url,
                     headers=default_headers,
                     params=params,
+                    timeout=timeout_seconds,
                     follow_redirects=True,
                 )
 
-                if response.status_code != 200:
-                    error = APIException(
-                        message="API请求失败",
-                        status_code=response.status_code,
-                        api_url=url,
+            if response.status_code == 304 and conditional:
+                logger.debug(f"内容未变化: {url}")
+                return response
+
+            if response.status_code != 200:
+                error = APIException(
+                    message="API请求失败",
+                    status_code=response.status_code,
+                    api_url=url,
+                )
+                if response.status_code in [429, 500, 502, 503, 504]:
+                    last_error = error
+                    retries += 1
+                    logger.warning(
+                        f"服务器返回错误状态码 {response.status_code}，第{retries}次重试: {url}"
                     )
-                    if response.status_code in [429, 500, 502, 503, 504]:
-                        last_error = error
-                        retries += 1
-                        logger.warning(
-                            f"服务器返回错误状态码 {response.status_code}，第{retries}次重试: {url}"
-                        )
-
-                        retry_after = response.headers.get("Retry-After")
-                        if retry_after and retry_after.isdigit():
-                            await asyncio.sleep(int(retry_after))
-                        else:
-                            await asyncio.sleep(retry_delay)
-                            retry_delay *= 1.5
-
-                        continue
-                    else:
-                        raise error
 
-                return response
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        # 暂停该主机的所有请求，下次请求时在限速器中等待
+                        host_limiter.defer(url, retry_after)
+                    elif retries <= max_retries:
+                        await asyncio.sleep(retry_delay)
+                        retry_delay *= 1.5
+
+                    continue
+                else:
+                    raise error
+
+            if conditional:
+                validator_cache.update(url, params, response)
+            return response
+
+        except APIHostDeferredException:
+            # 主机暂停时间超过可等待时间，直接失败以便切换到其他API源
+            raise
 
         except httpx.TimeoutException:
             last_error = APITimeoutException(
@@ -94,8 +132,9 @@ async def fetch_with_retry(
             )
             retries += 1
             logger.warning(f"请求超时，第{retries}次重试: {url}")
-            await asyncio.sleep(retry_delay)
-            retry_delay *= 1.5
+            if retries <= max_retries:
+                await asyncio.sleep(retry_delay)
+                retry_delay *= 1.5
 
         except Exception as e:
             last_error = APIException(
@@ -104,8 +143,9 @@ async def fetch_with_retry(
             )
             retries += 1
             logger.warning(f"请求失败，第{retries}次重试: {url}, 错误: {e!s}")
-            await asyncio.sleep(retry_delay)
-            retry_delay *= 1.5
+            if retries <= max_retries:
+                await asyncio.sleep(retry_delay)
+                retry_delay *= 1.5
 
     raise last_error or APIException(f"请求失败，已重试{max_retries}次", api_url=url)
 
@@ -141,6 +181,15 @@ def format_time(hour: int, minute: int) -> str:
     return f"{hour:02d}:{minute:02d}"
 
 
+def percentile(values: list[float], percent: float) -> float:
+    """计算百分位数（最近秩法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
 def get_current_time() -> str:
     """获取当前时间"""
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -185,6 +234,92 @@ async def render_news_to_image(
     elif template_name == "sixty_seconds.html":
         viewport = {"width": 520, "height": 600}
 
+    cache_key = None
+    if get_plugin_config(Config).daily_news_render_cache:
+        cache_key = build_render_cache_key(template_path, template_name, data, viewport)
+        if cache_key:
+            cached_pic = render_cache.get(cache_key, "png")
+            if cached_pic:
+                logger.debug(f"模板 {template_name} 的内容未变化，使用缓存的渲染结果")
+                return cached_pic
+
+    async with render_scheduler.slot():
+        pic = await _render_template(template_path, template_name, data, viewport)
+
+    if pic and cache_key:
+        render_cache.set(cache_key, pic, "png")
+
+    return pic
+
+
+async def render_news_to_fit(
+    news_data: Any,
+    template_name: str,
+    title: str,
+    template_data: dict[str, Any] = None,
+    max_bytes: int = 1024 * 1024,
+    max_items: int | None = None,
+    min_items: int = 1,
+) -> tuple[bytes | None, int]:
+    """在大小限制内渲染新闻数据为图片
+
+    根据同一模板以往的渲染结果估算条目数，通常只需渲染一次；
+    超出限制时先重新编码压缩，仍然过大才按实际大小减少条目重新渲染。
+
+    Returns:
+        图片数据和实际渲染的条目数
+    """
+    from ..models import NewsData
+
+    items = getattr(news_data, "items", [])
+    max_items = min(max_items or len(items), len(items))
+    min_items = max(1, min(min_items, max_items))
+    count = render_size_estimator.estimate(template_name, max_bytes, max_items, min_items)
+
+    pic = None
+    for _ in range(render_size_estimator.MAX_ATTEMPTS):
+        partial_data = NewsData(
+            title=news_data.title,
+            items=items[:count],
+            update_time=news_data.update_time,
+            source=news_data.source,
+        )
+        pic = await render_news_to_image(partial_data, template_name, title, template_data)
+        if not pic:
+            return None, count
+
+        render_size_estimator.record(template_name, count, len(pic), max_bytes)
+        if len(pic) <= max_bytes:
+            logger.debug(f"模板 {template_name} 渲染 {count} 条，大小: {len(pic) / 1024:.1f}KB")
+            return pic, count
+
+        logger.debug(
+            f"模板 {template_name} 渲染 {count} 条后图片过大: {len(pic) / 1024 / 1024:.2f}MB，尝试重新编码"
+        )
+        rendered_size = len(pic)
+        pic = await asyncio.to_thread(optimize_image, pic, max_bytes)
+        if len(pic) <= max_bytes or count <= min_items:
+            return pic, count
+
+        count = max(min_items, min(count - 1, int(count * max_bytes / rendered_size)))
+        logger.warning(f"模板 {template_name} 重新编码后仍然过大，减少到 {count} 条重新渲染")
+
+    return pic, count
+
+
+async def _render_template(
+    template_path: Path,
+    template_name: str,
+    data: dict[str, Any],
+    viewport: dict[str, int],
+) -> bytes | None:
+    """渲染模板，优先使用页面池"""
+    if render_page_pool.is_enabled():
+        try:
+            return await render_page_pool.render(template_path, template_name, data, viewport)
+        except Exception as e:
+            logger.warning(f"使用页面池渲染模板失败: {e}，回退到单独页面渲染")
+
     try:
         pic = await template_to_pic(
             template_path=str(template_path),
@@ -227,7 +362,11 @@ def generate_news_type_error(invalid_type: str, news_sources: dict[str, Any]) ->
 
 
 class BaseStorage(Generic[T]):
-    """基础存储类"""
+    """基础存储类
+
+    修改后的保存会在短暂延迟后合并为一次写入，写入在线程中进行，
+    先写临时文件再替换，避免写入中断导致文件损坏。关闭时需调用 flush 写入未保存的修改。
+    """
 
     def __init__(self, file_name: str, default_value: T):
         """初始化存储
@@ -240,19 +379,14 @@ class BaseStorage(Generic[T]):
         self.default_value = default_value
         self.storage_file = self._get_storage_file()
         self.data: T = self._load_data()
+        self._dirty = False
+        self._batch_depth = 0
+        self._save_task: asyncio.Task | None = None
+        self._write_lock: asyncio.Lock | None = None
 
     def _get_storage_file(self) -> Path:
         """获取存储文件路径"""
-        try:
-            config_dir = store.get_plugin_config_dir()
-        except (AttributeError, Exception):
-            try:
-                config_dir = store.get_config_dir("nonebot_plugin_multi_source_daily")
-            except (AttributeError, Exception):
-                config_dir = Path.home() / ".nonebot" / "nonebot_plugin_multi_source_daily" / "config"
-                config_dir.mkdir(parents=True, exist_ok=True)
-
-        return config_dir / self.file_name
+        return get_storage_dir() / self.file_name
 
     def _load_data(self) -> T:
         """加载数据"""
@@ -284,21 +418,122 @@ class BaseStorage(Generic[T]):
             logger.error(f"加载存储数据失败: {e}")
             return self.default_value
 
-    def _save_data(self, data: T) -> bool:
-        """保存数据"""
+    def _write_file(self, content: str) -> bool:
+        """写入临时文件后替换存储文件"""
+        temp_file = self.storage_file.with_name(f"{self.storage_file.name}.tmp")
         try:
             self.storage_file.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.storage_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(temp_file, "w", encoding="utf-8") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.storage_file)
             return True
         except Exception as e:
             logger.error(f"保存存储数据失败: {e}")
+            try:
+                temp_file.unlink(missing_ok=True)
+            except Exception:
+                pass
+            return False
+
+    def _save_data(self, data: T) -> bool:
+        """立即保存数据"""
+        try:
+            content = json.dumps(data, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.error(f"序列化存储数据失败: {e}")
             return False
+        return self._write_file(content)
 
     def save(self) -> bool:
-        """保存当前数据"""
-        return self._save_data(self.data)
+        """保存当前数据
+
+        在事件循环中调用时延迟合并写入，否则立即写入。
+        """
+        if self._batch_depth > 0:
+            self._dirty = True
+            return True
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._dirty = False
+            return self._save_data(self.data)
+
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._delayed_save())
+        return True
+
+    def save_now(self) -> bool:
+        """不等待合并窗口，立即保存当前数据
+
+        在事件循环中调用时在下一轮写入，与其他写入按顺序执行。
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._dirty = False
+            return self._save_data(self.data)
+
+        self._dirty = True
+        loop.create_task(self._write_pending())
+        return True
+
+    async def _delayed_save(self) -> None:
+        """等待合并窗口结束后写入"""
+        delay = get_plugin_config(Config).daily_news_storage_save_delay
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self._write_pending()
+
+    async def _write_pending(self) -> bool:
+        """在线程中写入未保存的修改"""
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+
+        async with self._write_lock:
+            if not self._dirty:
+                return True
+            self._dirty = False
+
+            try:
+                # 在事件循环中序列化，避免线程写入时数据被修改
+                content = json.dumps(self.data, ensure_ascii=False, indent=2)
+            except Exception as e:
+                logger.error(f"序列化存储数据失败: {e}")
+                return False
+
+            if await asyncio.to_thread(self._write_file, content):
+                logger.debug(f"已保存存储数据: {self.storage_file}")
+                return True
+
+            self._dirty = True
+            return False
+
+    async def flush(self) -> bool:
+        """立即写入未保存的修改"""
+        task, self._save_task = self._save_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        return await self._write_pending()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """批量修改，退出时只保存一次"""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self.save()
 
     def reset(self) -> bool:
         """重置为默认值"""
@@ -342,6 +577,23 @@ class ScheduleStorage(BaseStorage[Dict[str, Dict[str, Dict[str, Any]]]]):
         }
         return self.save()
 
+    def set_group_schedules(
+        self,
+        group_ids: list[int],
+        news_type: str,
+        schedule_time: str,
+        format_type: str,
+    ) -> int:
+        """批量设置多个群组的定时任务配置，只保存一次
+
+        Returns:
+            设置的群组数量
+        """
+        with self.batch():
+            for group_id in group_ids:
+                self.set_group_schedule(group_id, news_type, schedule_time, format_type)
+        return len(group_ids)
+
     def remove_group_schedule(self, group_id: int, news_type: str) -> bool:
         """移除群组的特定日报类型的定时任务配置"""
         group_id_str = str(group_id)
@@ -352,6 +604,19 @@ class ScheduleStorage(BaseStorage[Dict[str, Dict[str, Dict[str, Any]]]]):
             return self.save()
         return False
 
+    def remove_group_schedules(self, group_ids: list[int], news_type: str) -> int:
+        """批量移除多个群组的特定日报类型的定时任务配置，只保存一次
+
+        Returns:
+            移除的群组数量
+        """
+        removed = 0
+        with self.batch():
+            for group_id in group_ids:
+                if self.remove_group_schedule(group_id, news_type):
+                    removed += 1
+        return removed
+
     def get_group_schedules(self, group_id: int) -> Dict[str, Dict[str, Any]]:
         """获取群组的所有定时任务配置"""
         return self.data.get(str(group_id), {})
@@ -384,5 +649,22 @@ class ApiStatusStorage(BaseStorage[Dict[str, Any]]):
         super().__init__("api_status.json", {})
 
 
-schedule_store = ScheduleStorage()
-api_status_store = ApiStatusStorage()
+def _create_storages() -> tuple[
+    ScheduleStorage | SqliteScheduleStorage,
+    ApiStatusStorage | SqliteApiStatusStorage,
+]:
+    """按配置的存储后端创建定时任务和API状态存储"""
+    backend = get_plugin_config(Config).daily_news_storage_backend.lower()
+    if backend == "sqlite":
+        try:
+            db = SqliteDatabase()
+            return SqliteScheduleStorage(db), SqliteApiStatusStorage(db)
+        except Exception as e:
+            logger.error(f"初始化SQLite存储失败，将使用JSON存储: {e}")
+    elif backend != "json":
+        logger.warning(f"未知的存储后端: {backend}，将使用JSON存储")
+
+    return ScheduleStorage(), ApiStatusStorage()
+
+
+schedule_store, api_status_store = _create_storages()
@@ -0,0 +1,121 @@
+"""消息发送调度模块"""
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from nonebot import logger, get_plugin_config
+
+from ..config import Config, RetryConfig
+from .concurrency import TokenBucket
+from .core import percentile
+
+
+class SendDispatcher:
+    """批量消息发送调度器
+
+    按每秒发送数限速，可为每个目标加入随机延迟，限制同时发送的数量，
+    发送失败时按退避时间重试，并统计每次批量发送的结果。
+    """
+
+    def __init__(self):
+        """初始化发送调度器"""
+        self._bucket: TokenBucket | None = None
+        self.last_stats: dict[str, Any] | None = None
+
+    def _get_bucket(self, rate: float) -> TokenBucket | None:
+        """获取令牌桶，速率变化时重新创建"""
+        if rate <= 0:
+            return None
+        if self._bucket is None or self._bucket.rate != rate:
+            self._bucket = TokenBucket(rate, capacity=1)
+        return self._bucket
+
+    async def _send_one(
+        self,
+        target: Hashable,
+        send: Callable[[Hashable], Awaitable[Any]],
+        semaphore: asyncio.Semaphore,
+        bucket: TokenBucket | None,
+        jitter: float,
+        retries: int,
+        latencies: list[float],
+    ) -> bool:
+        """向单个目标发送，失败时重试"""
+        if jitter > 0:
+            await asyncio.sleep(random.uniform(0, jitter))
+
+        async with semaphore:
+            for attempt in range(retries + 1):
+                if bucket is not None:
+                    await bucket.acquire()
+
+                started = time.monotonic()
+                try:
+                    await send(target)
+                    latencies.append(time.monotonic() - started)
+                    return True
+                except Exception as e:
+                    if attempt >= retries:
+                        logger.error(f"向 {target} 发送消息失败，已重试 {retries} 次: {e}")
+                        return False
+
+                    delay = RetryConfig.INITIAL_DELAY * (RetryConfig.BACKOFF_MULTIPLIER**attempt)
+                    logger.warning(f"向 {target} 发送消息失败: {e}，{delay:.1f}秒后重试")
+                    await asyncio.sleep(delay)
+
+        return False
+
+    async def dispatch(
+        self,
+        targets: list[Hashable],
+        send: Callable[[Hashable], Awaitable[Any]],
+        name: str = "消息",
+    ) -> dict[str, Any]:
+        """向多个目标发送消息
+
+        Args:
+            targets: 发送目标列表
+            send: 发送函数，失败时应抛出异常
+            name: 用于日志的名称
+
+        Returns:
+            本次发送的统计信息
+        """
+        plugin_config = get_plugin_config(Config)
+        bucket = self._get_bucket(plugin_config.daily_news_send_rate)
+        semaphore = asyncio.Semaphore(max(1, plugin_config.daily_news_send_concurrency))
+        jitter = max(0.0, plugin_config.daily_news_send_jitter)
+        retries = max(0, plugin_config.daily_news_send_retries)
+
+        latencies: list[float] = []
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(
+                self._send_one(target, send, semaphore, bucket, jitter, retries, latencies)
+                for target in targets
+            )
+        )
+
+        sent = sum(1 for result in results if result)
+        stats = {
+            "name": name,
+            "total": len(targets),
+            "sent": sent,
+            "failed": len(targets) - sent,
+            "duration": time.monotonic() - started,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+        }
+        self.last_stats = stats
+
+        logger.info(
+            f"{name}发送完成: 成功 {stats['sent']}/{stats['total']}，失败 {stats['failed']}，"
+            f"耗时 {stats['duration']:.1f}秒，延迟 p50={stats['p50']:.2f}秒 p95={stats['p95']:.2f}秒"
+        )
+        return stats
+
+
+send_dispatcher = SendDispatcher()
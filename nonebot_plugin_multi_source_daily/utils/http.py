@@ -0,0 +1,285 @@
+"""共享HTTP客户端模块"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+from nonebot import logger, get_plugin_config
+
+from ..config import Config
+from ..exceptions import APIHostDeferredException
+from .concurrency import TokenBucket
+
+try:
+    import h2  # noqa: F401
+
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+
+class HttpClientManager:
+    """共享HTTP客户端管理器
+
+    按名称复用 httpx.AsyncClient，保持连接池和 keep-alive，
+    在驱动器启动时创建、关闭时统一释放。
+    """
+
+    DEFAULT_CLIENT = "default"
+
+    def __init__(self):
+        """初始化客户端管理器"""
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """按插件配置创建客户端"""
+        plugin_config = get_plugin_config(Config)
+
+        limits = httpx.Limits(
+            max_connections=plugin_config.daily_news_http_max_connections,
+            max_keepalive_connections=plugin_config.daily_news_http_max_keepalive_connections,
+            keepalive_expiry=plugin_config.daily_news_http_keepalive_expiry,
+        )
+
+        http2 = plugin_config.daily_news_http2
+        if http2 and not HAS_H2:
+            logger.warning("未安装 h2 模块，HTTP/2 不可用，将使用 HTTP/1.1")
+            http2 = False
+
+        return httpx.AsyncClient(
+            limits=limits,
+            http2=http2,
+            timeout=plugin_config.daily_news_timeout,
+        )
+
+    def get_client(self, name: str = DEFAULT_CLIENT) -> httpx.AsyncClient:
+        """获取指定名称的共享客户端，不存在或已关闭时自动创建"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create_client()
+            self._clients[name] = client
+            logger.debug(f"已创建共享HTTP客户端: {name}")
+        return client
+
+    async def startup(self) -> None:
+        """预先创建默认客户端"""
+        self.get_client()
+        logger.debug("共享HTTP客户端已就绪")
+
+    async def close(self) -> int:
+        """关闭所有客户端"""
+        count = 0
+        for name, client in list(self._clients.items()):
+            try:
+                if not client.is_closed:
+                    await client.aclose()
+                    count += 1
+            except Exception as e:
+                logger.warning(f"关闭HTTP客户端 {name} 失败: {e}")
+        self._clients.clear()
+        logger.debug(f"已关闭 {count} 个共享HTTP客户端")
+        return count
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """解析 Retry-After 响应头，支持秒数和HTTP日期格式"""
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostLimiter:
+    """按主机限制上游请求
+
+    同一主机的请求共用令牌桶和并发上限，多个日报源共用同一主机时请求会短暂排队，
+    而不是同时发出后触发429再退避。服务器返回 Retry-After 时该主机的所有请求暂停到指定时间，
+    暂停时间有上限，超过调用方可等待时间的请求直接失败。
+    """
+
+    def __init__(self):
+        """初始化主机限速器"""
+        self._buckets: dict[str, TokenBucket] = {}
+        self._semaphores: dict[str, tuple[int, asyncio.Semaphore]] = {}
+        self._blocked_until: dict[str, float] = {}
+        self.stats: dict[str, dict[str, float]] = {}
+
+    @staticmethod
+    def _get_host(url: str | httpx.URL) -> str:
+        """获取URL的主机名"""
+        return httpx.URL(url).host
+
+    def _get_bucket(self, host: str) -> TokenBucket | None:
+        """获取主机的令牌桶，速率变化时重新创建"""
+        plugin_config = get_plugin_config(Config)
+        rate = plugin_config.daily_news_host_rate_limits.get(host, plugin_config.daily_news_host_default_rate)
+        if rate <= 0:
+            return None
+
+        bucket = self._buckets.get(host)
+        if bucket is None or bucket.rate != rate:
+            bucket = self._buckets[host] = TokenBucket(rate)
+        return bucket
+
+    def _get_semaphore(self, host: str) -> asyncio.Semaphore | None:
+        """获取主机的并发信号量，上限变化时重新创建"""
+        plugin_config = get_plugin_config(Config)
+        limit = plugin_config.daily_news_host_concurrency_limits.get(
+            host, plugin_config.daily_news_host_default_concurrency
+        )
+        if limit <= 0:
+            return None
+
+        cached = self._semaphores.get(host)
+        if cached is None or cached[0] != limit:
+            cached = self._semaphores[host] = (limit, asyncio.Semaphore(limit))
+        return cached[1]
+
+    def defer(self, url: str | httpx.URL, seconds: float) -> None:
+        """暂停该主机的请求指定秒数，不超过配置的上限"""
+        host = self._get_host(url)
+        seconds = min(seconds, max(0.0, get_plugin_config(Config).daily_news_host_max_defer))
+        until = time.monotonic() + seconds
+        if until > self._blocked_until.get(host, 0):
+            self._blocked_until[host] = until
+            logger.warning(f"主机 {host} 要求 {seconds:.1f}秒后重试，暂停该主机的请求")
+
+    def get_blocked_remaining(self, url: str | httpx.URL) -> float:
+        """获取主机剩余的暂停时间（秒）"""
+        return max(0.0, self._blocked_until.get(self._get_host(url), 0) - time.monotonic())
+
+    async def _wait_unblocked(self, url: str | httpx.URL, deadline: float) -> None:
+        """等待主机暂停结束，超过截止时间时直接抛出异常"""
+        blocked = self.get_blocked_remaining(url)
+        if blocked <= 0:
+            return
+        if time.monotonic() + blocked > deadline:
+            raise APIHostDeferredException(api_url=str(url), retry_after=blocked)
+        await asyncio.sleep(blocked)
+
+    @asynccontextmanager
+    async def limit(self, url: str | httpx.URL, max_wait: float | None = None) -> AsyncIterator[None]:
+        """在主机的并发和速率限制内执行请求
+
+        Args:
+            url: 请求地址
+            max_wait: 最多等待主机暂停结束的秒数，默认为请求超时时间
+        """
+        host = self._get_host(url)
+        stats = self.stats.setdefault(host, {"requests": 0, "queued": 0, "total_wait": 0.0})
+        started = time.monotonic()
+        if max_wait is None:
+            max_wait = get_plugin_config(Config).daily_news_timeout
+        deadline = started + max_wait
+
+        semaphore = self._get_semaphore(host)
+        while True:
+            # 在获取并发名额之前等待，暂停期间不占用名额
+            await self._wait_unblocked(url, deadline)
+            if semaphore is not None:
+                await semaphore.acquire()
+            if self.get_blocked_remaining(url) <= 0:
+                break
+            # 排队期间主机被要求暂停，归还名额后重新等待
+            if semaphore is not None:
+                semaphore.release()
+
+        try:
+            bucket = self._get_bucket(host)
+            if bucket is not None:
+                await bucket.acquire()
+
+            waited = time.monotonic() - started
+            stats["requests"] += 1
+            if waited > 0.01:
+                stats["queued"] += 1
+                stats["total_wait"] += waited
+                logger.debug(f"请求 {host} 排队 {waited:.2f}秒")
+
+            yield
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    def get_status(self) -> dict[str, Any]:
+        """获取各主机的请求统计"""
+        return {host: dict(stats) for host, stats in self.stats.items()}
+
+
+class ValidatorCache:
+    """条件请求验证器缓存
+
+    按URL和请求参数记录响应的 ETag 和 Last-Modified，
+    再次请求时发送 If-None-Match 和 If-Modified-Since，内容未变化时服务器返回304。
+    """
+
+    MAX_ENTRIES = 256
+
+    def __init__(self):
+        """初始化验证器缓存"""
+        self._validators: dict[tuple[str, tuple], dict[str, str]] = {}
+
+    @staticmethod
+    def get_key(url: str, params: dict[str, Any] | None = None) -> tuple[str, tuple]:
+        """生成缓存键"""
+        return url, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+
+    def has(self, url: str, params: dict[str, Any] | None = None) -> bool:
+        """检查是否记录了验证器"""
+        return self.get_key(url, params) in self._validators
+
+    def get_headers(self, url: str, params: dict[str, Any] | None = None) -> dict[str, str]:
+        """获取条件请求头"""
+        validators = self._validators.get(self.get_key(url, params), {})
+        headers = {}
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last_modified" in validators:
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def update(self, url: str, params: dict[str, Any] | None, response: httpx.Response) -> bool:
+        """按响应头更新验证器，响应没有验证器时移除记录"""
+        key = self.get_key(url, params)
+        validators = {}
+        if etag := response.headers.get("ETag"):
+            validators["etag"] = etag
+        if last_modified := response.headers.get("Last-Modified"):
+            validators["last_modified"] = last_modified
+
+        if not validators:
+            self._validators.pop(key, None)
+            return False
+
+        self._validators.pop(key, None)
+        self._validators[key] = validators
+        while len(self._validators) > self.MAX_ENTRIES:
+            del self._validators[next(iter(self._validators))]
+        return True
+
+    def forget(self, url: str, params: dict[str, Any] | None = None) -> None:
+        """移除验证器，下次请求将获取完整内容"""
+        self._validators.pop(self.get_key(url, params), None)
+
+
+http_client_manager = HttpClientManager()
+host_limiter = HostLimiter()
+validator_cache = ValidatorCache()
+
+
+def get_http_client(name: str = HttpClientManager.DEFAULT_CLIENT) -> httpx.AsyncClient:
+    """获取共享HTTP客户端的便捷函数"""
+    return http_client_manager.get_client(name)
@@ -0,0 +1,135 @@
+"""出站图片模块"""
+
+import base64
+import hashlib
+import os
+import re
+from pathlib import Path
+
+from nonebot import logger, get_plugin_config
+from nonebot.adapters.onebot.v11 import Message, MessageSegment
+from nonebot.drivers import URL, ASGIMixin, Driver, HTTPServerSetup, Request, Response
+
+from ..config import Config
+from .cache import FileCache, image_outbox_store
+
+
+class ImageOutbox:
+    """出站图片存储
+
+    群发时将消息中的 base64 图片按内容哈希写入文件一次，
+    再以 file:// 路径或机器人提供的 HTTP 地址发送，避免每个群都重复上传同一张图片。
+    """
+
+    ROUTE_PATH = "/daily_news/image"
+    SEND_MODES = ("base64", "file", "url")
+
+    _NAME_PATTERN = re.compile(r"^[0-9a-f]{64}\.(png|jpg|gif|webp)$")
+    _IMAGE_TYPES = (
+        (b"\x89PNG", "png", "image/png"),
+        (b"\xff\xd8", "jpg", "image/jpeg"),
+        (b"GIF8", "gif", "image/gif"),
+        (b"RIFF", "webp", "image/webp"),
+    )
+
+    def __init__(self, store: FileCache):
+        """初始化出站图片存储"""
+        self.store = store
+        self._route_registered = False
+
+    @classmethod
+    def _guess_type(cls, data: bytes) -> tuple[str, str]:
+        """根据文件头判断图片扩展名和类型"""
+        for magic, extension, content_type in cls._IMAGE_TYPES:
+            if data.startswith(magic):
+                return extension, content_type
+        return "png", "image/png"
+
+    def save(self, data: bytes) -> tuple[str, Path]:
+        """按内容哈希保存图片，相同内容只写入一次
+
+        Returns:
+            文件名和文件路径
+        """
+        extension, _ = self._guess_type(data)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.store.get_file_path(digest, extension)
+        try:
+            # 复用已有文件时刷新修改时间，避免发送过程中被当作过期文件清理
+            os.utime(path)
+        except FileNotFoundError:
+            if not self.store.set(digest, data, extension):
+                raise OSError(f"写入出站图片失败: {path}")
+        return f"{digest}.{extension}", path
+
+    def get_mode(self) -> str:
+        """获取当前的图片发送方式，配置无效时使用 base64"""
+        plugin_config = get_plugin_config(Config)
+        mode = plugin_config.daily_news_image_send_mode.lower()
+        if mode not in self.SEND_MODES:
+            logger.warning(f"未知的图片发送方式: {mode}，将使用 base64")
+            return "base64"
+        if mode == "url" and not (plugin_config.daily_news_image_base_url and self._route_registered):
+            logger.warning("图片地址未配置或当前驱动器不支持HTTP服务，将使用 base64 发送图片")
+            return "base64"
+        return mode
+
+    def prepare(self, message: Message) -> Message:
+        """将消息中的 base64 图片替换为文件路径或URL"""
+        mode = self.get_mode()
+        if mode == "base64":
+            return message
+
+        base_url = get_plugin_config(Config).daily_news_image_base_url.rstrip("/")
+        result = Message()
+        for segment in message:
+            file = segment.data.get("file") if segment.type == "image" else None
+            if not (isinstance(file, str) and file.startswith("base64://")):
+                result.append(segment)
+                continue
+
+            try:
+                name, path = self.save(base64.b64decode(file[len("base64://") :]))
+            except Exception as e:
+                logger.warning(f"保存出站图片失败，将使用 base64 发送: {e}")
+                result.append(segment)
+                continue
+
+            if mode == "file":
+                result.append(MessageSegment.image(path))
+            else:
+                result.append(MessageSegment.image(f"{base_url}{self.ROUTE_PATH}?name={name}"))
+
+        return result
+
+    async def _handle_request(self, request: Request) -> Response:
+        """提供出站图片的下载"""
+        name = request.url.query.get("name", "")
+        if not self._NAME_PATTERN.match(name):
+            return Response(400, content="invalid image name")
+
+        digest, extension = name.split(".")
+        data = self.store.get(digest, extension)
+        if data is None:
+            return Response(404, content="image not found")
+
+        _, content_type = self._guess_type(data)
+        return Response(200, headers={"Content-Type": content_type}, content=data)
+
+    def setup_route(self, driver: Driver) -> bool:
+        """在支持HTTP服务的驱动器上注册图片下载地址"""
+        if self._route_registered:
+            return True
+        if not isinstance(driver, ASGIMixin):
+            logger.debug("当前驱动器不支持HTTP服务，无法提供出站图片地址")
+            return False
+
+        driver.setup_http_server(
+            HTTPServerSetup(URL(self.ROUTE_PATH), "GET", "daily_news_image", self._handle_request)
+        )
+        self._route_registered = True
+        logger.debug(f"已注册出站图片地址: {self.ROUTE_PATH}")
+        return True
+
+
+image_outbox = ImageOutbox(image_outbox_store)
@@ -0,0 +1,355 @@
+"""模板渲染页面池"""
+
+import asyncio
+import dataclasses
+import hashlib
+import heapq
+import itertools
+import json
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+from nonebot import logger, get_plugin_config
+
+from .. import HAS_HTMLRENDER
+from ..config import Config, RenderPriority
+
+if HAS_HTMLRENDER:
+    import jinja2
+    import jinja2.meta
+    from nonebot_plugin_htmlrender import get_browser
+
+_template_envs: dict[str, "jinja2.Environment"] = {}
+
+
+def get_template_env(template_path: str | Path) -> "jinja2.Environment":
+    """获取模板目录对应的模板环境，模板解析结果会被缓存"""
+    template_path = str(template_path)
+    env = _template_envs.get(template_path)
+    if env is None:
+        env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(template_path),
+            enable_async=True,
+        )
+        _template_envs[template_path] = env
+    return env
+
+
+def _to_jsonable(value: Any) -> Any:
+    """将模板数据中的对象转为可序列化的形式"""
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+def build_render_cache_key(
+    template_path: str | Path,
+    template_name: str,
+    templates: dict[str, Any],
+    viewport: dict[str, int],
+) -> str | None:
+    """生成渲染结果的缓存键
+
+    由模板源码、模板实际引用的变量和视口大小计算哈希，
+    模板中未使用的数据（如获取时间）变化不会导致缓存失效。
+    """
+    try:
+        env = get_template_env(template_path)
+        source, _, _ = env.loader.get_source(env, template_name)
+        variables = jinja2.meta.find_undeclared_variables(env.parse(source))
+        payload = json.dumps(
+            {
+                "template": template_name,
+                "variables": {name: templates.get(name) for name in sorted(variables)},
+                "viewport": viewport,
+                "scale": RenderPagePool.DEVICE_SCALE_FACTOR,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+            default=_to_jsonable,
+        )
+    except Exception as e:
+        logger.debug(f"生成渲染缓存键失败: {e}")
+        return None
+
+    digest = hashlib.sha256(source.encode("utf-8"))
+    digest.update(payload.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RenderPagePool:
+    """模板渲染页面池
+
+    所有页面共用一个浏览器上下文，创建时打开模板目录，
+    之后每次渲染只替换页面内容，字体和样式等资源无需重复加载。
+    """
+
+    DEVICE_SCALE_FACTOR = 2
+    SCREENSHOT_TIMEOUT = 30_000
+
+    def __init__(self):
+        """初始化页面池"""
+        self._context = None
+        self._idle: list = []
+        self._page_dirs: dict[Any, str] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+
+    @property
+    def size(self) -> int:
+        """页面池大小"""
+        return max(0, get_plugin_config(Config).daily_news_render_page_pool_size)
+
+    def is_enabled(self) -> bool:
+        """检查是否启用页面池"""
+        return HAS_HTMLRENDER and self.size > 0
+
+    async def _get_context(self):
+        """获取共享的浏览器上下文，浏览器重启后重新创建"""
+        if self._context is None or not self._context.browser.is_connected():
+            browser = await get_browser()
+            self._context = await browser.new_context(device_scale_factor=self.DEVICE_SCALE_FACTOR)
+            self._page_dirs.clear()
+            self._idle.clear()
+            logger.debug("已创建渲染页面池的浏览器上下文")
+        return self._context
+
+    async def _create_page(self, template_path: str):
+        """创建新页面并打开模板目录"""
+        context = await self._get_context()
+        page = await context.new_page()
+        page.on("console", lambda msg: logger.debug(f"浏览器控制台: {msg.text}"))
+        await page.goto(f"file://{template_path}")
+        self._page_dirs[page] = template_path
+        logger.debug(f"已创建渲染页面，当前页面数: {len(self._page_dirs)}/{self.size}")
+        return page
+
+    async def _acquire(self, template_path: str):
+        """取出一个空闲页面，没有空闲页面时创建新页面
+
+        同时使用的页面数由信号量限制为池大小，调用方需在 _release 中归还。
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+
+        await self._semaphore.acquire()
+        try:
+            while self._idle:
+                page = self._idle.pop()
+                if not page.is_closed():
+                    return page
+                self._page_dirs.pop(page, None)
+            return await self._create_page(template_path)
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    async def _release(self, page, broken: bool = False) -> None:
+        """归还页面，出错的页面直接关闭"""
+        try:
+            if broken or page.is_closed():
+                self._page_dirs.pop(page, None)
+                try:
+                    await page.close()
+                except Exception as e:
+                    logger.debug(f"关闭渲染页面失败: {e}")
+            else:
+                self._idle.append(page)
+        finally:
+            self._semaphore.release()
+
+    async def render(
+        self,
+        template_path: str | Path,
+        template_name: str,
+        templates: dict[str, Any],
+        viewport: dict[str, int],
+    ) -> bytes:
+        """使用池中的页面渲染模板"""
+        template_path = str(template_path)
+        template = get_template_env(template_path).get_template(template_name)
+        html = await template.render_async(**templates)
+
+        page = await self._acquire(template_path)
+        broken = False
+        try:
+            if self._page_dirs.get(page) != template_path:
+                await page.goto(f"file://{template_path}")
+                self._page_dirs[page] = template_path
+
+            await page.set_viewport_size(viewport)
+            await page.set_content(html, wait_until="networkidle")
+            return await page.screenshot(
+                full_page=True,
+                type="png",
+                timeout=self.SCREENSHOT_TIMEOUT,
+            )
+        except Exception:
+            broken = True
+            raise
+        finally:
+            await self._release(page, broken)
+
+    async def close(self) -> None:
+        """关闭所有页面和浏览器上下文"""
+        context, self._context = self._context, None
+        self._page_dirs.clear()
+        self._idle.clear()
+        if context is None:
+            return
+
+        try:
+            await context.close()
+            logger.debug("已关闭渲染页面池")
+        except Exception as e:
+            logger.debug(f"关闭渲染页面池失败: {e}")
+
+
+render_priority: ContextVar[int] = ContextVar("render_priority", default=RenderPriority.COMMAND)
+
+
+class RenderScheduler:
+    """渲染调度器
+
+    限制同时进行的浏览器渲染和截图数量，超出上限的请求按优先级排队，
+    优先级相同时先到先得。未指定优先级时使用当前上下文的 render_priority。
+    """
+
+    def __init__(self):
+        """初始化渲染调度器"""
+        self._running = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self.stats = {
+            "completed": 0,
+            "queued": 0,
+            "max_queue_depth": 0,
+            "total_wait": 0.0,
+        }
+
+    @property
+    def limit(self) -> int:
+        """并发上限"""
+        return max(1, get_plugin_config(Config).daily_news_render_concurrency)
+
+    def _wake_next(self) -> None:
+        """唤醒等待队列中优先级最高的请求"""
+        while self._waiters and self._running < self.limit:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._running += 1
+                future.set_result(None)
+
+    async def _acquire(self, priority: int) -> None:
+        """获取渲染名额"""
+        if self._running < self.limit and not self._waiters:
+            self._running += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self.stats["queued"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._waiters))
+        logger.debug(f"渲染请求排队中，优先级: {priority}，队列长度: {len(self._waiters)}")
+
+        started = time.monotonic()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已分配名额后被取消，交给下一个请求
+                self._running -= 1
+                self._wake_next()
+            raise
+        finally:
+            self.stats["total_wait"] += time.monotonic() - started
+
+    def _release(self) -> None:
+        """释放渲染名额"""
+        self._running -= 1
+        self.stats["completed"] += 1
+        self._wake_next()
+
+    @asynccontextmanager
+    async def slot(self, priority: int | None = None) -> AsyncIterator[None]:
+        """在渲染名额内执行"""
+        await self._acquire(render_priority.get() if priority is None else priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def get_status(self) -> dict[str, Any]:
+        """获取调度状态"""
+        waiting: dict[int, int] = {}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                waiting[priority] = waiting.get(priority, 0) + 1
+
+        queued = self.stats["queued"]
+        return {
+            "limit": self.limit,
+            "running": self._running,
+            "waiting": sum(waiting.values()),
+            "waiting_by_priority": waiting,
+            "completed": self.stats["completed"],
+            "queued": queued,
+            "max_queue_depth": self.stats["max_queue_depth"],
+            "avg_wait": self.stats["total_wait"] / queued if queued else 0.0,
+        }
+
+
+class RenderSizeEstimator:
+    """渲染图片大小估算器
+
+    按模板记录每个条目平均占用的字节数和已知能满足大小限制的条目数，
+    用于在渲染前估算条目数，避免逐步减少条目反复渲染。
+    """
+
+    SMOOTHING = 0.5
+    SAFETY_FACTOR = 0.9
+    MAX_ATTEMPTS = 3
+
+    def __init__(self):
+        """初始化估算器"""
+        self.bytes_per_item: dict[str, float] = {}
+        self.fit_counts: dict[tuple[str, int], int] = {}
+
+    def estimate(self, template_name: str, max_bytes: int, max_items: int, min_items: int = 1) -> int:
+        """估算在大小限制内能容纳的条目数"""
+        per_item = self.bytes_per_item.get(template_name)
+        if per_item is None:
+            count = max_items
+        else:
+            count = int(max_bytes * self.SAFETY_FACTOR / per_item)
+            count = max(count, self.fit_counts.get((template_name, max_bytes), 0))
+        return max(min_items, min(max_items, count))
+
+    def record(self, template_name: str, item_count: int, size: int, max_bytes: int | None = None) -> None:
+        """记录一次渲染结果"""
+        if item_count <= 0:
+            return
+
+        per_item = size / item_count
+        previous = self.bytes_per_item.get(template_name)
+        if previous is not None:
+            per_item = previous + (per_item - previous) * self.SMOOTHING
+        self.bytes_per_item[template_name] = per_item
+
+        if max_bytes is not None and size <= max_bytes:
+            self.fit_counts[(template_name, max_bytes)] = item_count
+
+    def get_status(self) -> dict[str, Any]:
+        """获取估算状态"""
+        return {
+            "bytes_per_item": dict(self.bytes_per_item),
+            "fit_counts": {f"{name}@{limit}": count for (name, limit), count in self.fit_counts.items()},
+        }
+
+
+render_page_pool = RenderPagePool()
+render_scheduler = RenderScheduler()
+render_size_estimator = RenderSizeEstimator()
@@ -1,19 +1,233 @@
+import time
 from typing import Any
 
-from nonebot import get_bot, logger, require
+from nonebot import get_bot, get_plugin_config, logger, require
+from ..config import Config, RenderPriority
 from ..exceptions import InvalidTimeFormatException, ScheduleException
-from .core import format_time, validate_time, schedule_store
+from .cache import news_snapshot_store
+from .dispatcher import send_dispatcher
+from .outbox import image_outbox
+from .render import render_priority
+from .core import format_time, parse_time, validate_time, schedule_store
 
 require("nonebot_plugin_apscheduler")
 from nonebot_plugin_apscheduler import scheduler  # noqa: E402
 
 
+SlotKey = tuple[str, str, int, int]
+
+
+class JobRegistry:
+    """定时订阅索引
+
+    按群和日报类型索引所有订阅，并按 (日报源名称, 格式, 小时, 分钟) 汇总每个发送时段的群，
+    由 ScheduleManager 在增删订阅时同步更新，查询无需遍历全部订阅或调度器中的任务。
+    """
+
+    def __init__(self):
+        """初始化订阅索引"""
+        self.by_group: dict[int, dict[str, SlotKey]] = {}
+        self.by_news_type: dict[str, set[int]] = {}
+        self.slots: dict[SlotKey, set[int]] = {}
+
+    def clear(self) -> None:
+        """清空索引"""
+        self.by_group.clear()
+        self.by_news_type.clear()
+        self.slots.clear()
+
+    def add(self, group_id: int, news_type: str, slot: SlotKey) -> None:
+        """添加或更新群的订阅"""
+        self.remove(group_id, news_type)
+        self.by_group.setdefault(group_id, {})[news_type] = slot
+        self.by_news_type.setdefault(slot[0], set()).add(group_id)
+        self.slots.setdefault(slot, set()).add(group_id)
+
+    def remove(self, group_id: int, news_type: str) -> bool:
+        """移除群的订阅"""
+        group_slots = self.by_group.get(group_id)
+        if not group_slots or news_type not in group_slots:
+            return False
+
+        slot = group_slots.pop(news_type)
+        if not group_slots:
+            del self.by_group[group_id]
+
+        if not any(other[0] == slot[0] for other in group_slots.values()):
+            self._discard(self.by_news_type, slot[0], group_id)
+        self._discard(self.slots, slot, group_id)
+        return True
+
+    @staticmethod
+    def _discard(index: dict, key: Any, group_id: int) -> None:
+        """从索引中移除群，集合为空时删除键"""
+        groups = index.get(key)
+        if groups is not None:
+            groups.discard(group_id)
+            if not groups:
+                del index[key]
+
+    def get_group(self, group_id: int) -> dict[str, SlotKey]:
+        """获取群的所有订阅"""
+        return self.by_group.get(group_id, {})
+
+    def get_slot_groups(self, slot: SlotKey) -> list[int]:
+        """获取订阅了指定发送时段的群"""
+        return sorted(self.slots.get(slot, ()))
+
+    def get_groups_by_news_type(self, source_name: str) -> list[int]:
+        """获取订阅了指定日报源的群"""
+        return sorted(self.by_news_type.get(source_name, ()))
+
 
 class ScheduleManager:
-    """定时任务管理器"""
+    """定时任务管理器
+
+    每个 (日报类型, 时间, 格式) 只注册一个发送任务，触发时获取并渲染一次，
+    再发送给所有订阅的群；各群的订阅配置仍保存在 schedule_store 中，并在 registry 中建立索引。
+    """
+
+    SLOT_JOB_PREFIX = "daily_news_slot_"
+    PREWARM_JOB_PREFIX = "prewarm_daily_news_"
 
     def __init__(self):
         """初始化定时任务管理器"""
+        self.registry = JobRegistry()
+        self._job_ids: dict[str, set[str]] = {}
+
+    def _get_slot_job_id(self, news_type: str, format_type: str, hour: int, minute: int) -> str:
+        """生成发送任务ID"""
+        return f"{self.SLOT_JOB_PREFIX}{news_type}_{format_type}_{format_time(hour, minute)}"
+
+    @staticmethod
+    def _resolve_source_name(news_type: str, cache: dict[str, str | None] | None = None) -> str | None:
+        """获取日报类型对应的日报源名称，未知类型返回None"""
+        if cache is not None and news_type in cache:
+            return cache[news_type]
+
+        from ..api.sources import get_news_source
+
+        source = get_news_source(news_type)
+        source_name = source.name if source else None
+        if cache is not None:
+            cache[news_type] = source_name
+        return source_name
+
+    def _load_registry(self) -> None:
+        """按 schedule_store 重建订阅索引"""
+        self.registry.clear()
+        # 每种日报类型只解析一次日报源，未知类型只提示一次
+        source_names: dict[str, str | None] = {}
+        for group_id, group_schedules in schedule_store.get_all_schedules().items():
+            for news_type, schedule in group_schedules.items():
+                if "schedule_time" not in schedule:
+                    continue
+
+                known = news_type in source_names
+                source_name = self._resolve_source_name(news_type, source_names)
+                if source_name is None:
+                    if not known:
+                        logger.warning(f"未知的日报类型: {news_type}，跳过加载")
+                    continue
+
+                try:
+                    hour, minute = parse_time(schedule["schedule_time"])
+                except Exception as e:
+                    logger.error(f"解析定时任务时间失败 [group_id={group_id}, news_type={news_type}]: {e}")
+                    continue
+
+                slot = (source_name, schedule.get("format_type", "image"), hour, minute)
+                self.registry.add(int(group_id), news_type, slot)
+
+    def _sync_job_set(self, prefix: str, wanted: dict[str, dict[str, Any]]) -> None:
+        """使指定前缀的任务与期望的任务一致，已存在的任务保持不变"""
+        existing = self._job_ids.setdefault(prefix, set())
+
+        for job_id in existing - wanted.keys():
+            try:
+                scheduler.remove_job(job_id)
+                logger.debug(f"已移除定时任务: {job_id}")
+            except Exception as e:
+                logger.debug(f"移除任务时出现异常: {e}")
+            existing.discard(job_id)
+
+        for job_id, job_kwargs in wanted.items():
+            if job_id in existing:
+                continue
+
+            scheduler.add_job(
+                trigger="cron",
+                id=job_id,
+                replace_existing=True,
+                misfire_grace_time=60,
+                **job_kwargs,
+            )
+            existing.add(job_id)
+            logger.debug(f"已添加定时任务: {job_id}")
+
+    def _apply_jobs(self) -> int:
+        """按订阅索引同步发送任务和预热任务
+
+        Returns:
+            发送任务数量
+        """
+        slots = self.registry.slots
+
+        send_jobs: dict[str, dict[str, Any]] = {}
+        for news_type, format_type, hour, minute in slots:
+            send_jobs[self._get_slot_job_id(news_type, format_type, hour, minute)] = {
+                "func": self.send_scheduled_news,
+                "hour": hour,
+                "minute": minute,
+                "args": [news_type, format_type, hour, minute],
+            }
+        self._sync_job_set(self.SLOT_JOB_PREFIX, send_jobs)
+
+        prewarm_jobs: dict[str, dict[str, Any]] = {}
+        lead_minutes = get_plugin_config(Config).daily_news_prewarm_minutes
+        if lead_minutes > 0:
+            for news_type, format_type, hour, minute in slots:
+                prewarm_at = (hour * 60 + minute - lead_minutes) % (24 * 60)
+                job_id = f"{self.PREWARM_JOB_PREFIX}{news_type}_{format_type}_{format_time(hour, minute)}"
+                prewarm_jobs[job_id] = {
+                    "func": self.prewarm_daily_news,
+                    "hour": prewarm_at // 60,
+                    "minute": prewarm_at % 60,
+                    "args": [news_type, format_type],
+                }
+        self._sync_job_set(self.PREWARM_JOB_PREFIX, prewarm_jobs)
+
+        return len(send_jobs)
+
+    def sync_jobs(self) -> int:
+        """按 schedule_store 重建订阅索引，并同步发送任务和预热任务
+
+        Returns:
+            发送任务数量
+        """
+        self._load_registry()
+        return self._apply_jobs()
+
+    def _register(self, group_ids: list[int], news_type: str, hour: int, minute: int, format_type: str) -> None:
+        """将新的订阅加入索引"""
+        source_name = self._resolve_source_name(news_type)
+        if source_name is None:
+            logger.warning(f"未知的日报类型: {news_type}，不会创建定时任务")
+            return
+
+        for group_id in group_ids:
+            self.registry.add(int(group_id), news_type, (source_name, format_type, hour, minute))
+
+    def get_slot_groups(self, news_type: str, format_type: str, hour: int, minute: int) -> list[int]:
+        """获取订阅了指定发送时段的群"""
+        return self.registry.get_slot_groups((news_type, format_type, hour, minute))
+
+    def get_groups_by_news_type(self, news_type: str) -> list[int]:
+        """获取订阅了指定日报类型的群，按别名订阅的群也包括在内"""
+        source_name = self._resolve_source_name(news_type)
+        if source_name is None:
+            return []
+        return self.registry.get_groups_by_news_type(source_name)
 
     async def add_job(
         self,
@@ -30,35 +244,15 @@ class ScheduleManager:
                 time_str=f"{hour}:{minute}",
             )
 
-        job_id = f"daily_news_{group_id}_{news_type}"
-
         try:
-            try:
-                scheduler.remove_job(job_id)
-                logger.debug(f"已移除旧的定时任务: {job_id}")
-            except Exception as e:
-                if "No job by the id" in str(e):
-                    logger.debug(f"旧任务 {job_id} 不存在，跳过移除")
-                else:
-                    logger.debug(f"移除旧任务时出现异常: {e}")
-
-            scheduler.add_job(
-                self.send_daily_news,
-                "cron",
-                hour=hour,
-                minute=minute,
-                id=job_id,
-                args=[group_id, news_type, format_type],
-                replace_existing=True,
-                misfire_grace_time=60,
-            )
-
             schedule_store.set_group_schedule(
                 group_id=group_id,
                 news_type=news_type,
                 schedule_time=format_time(hour, minute),
                 format_type=format_type,
             )
+            self._register([group_id], news_type, hour, minute, format_type)
+            self._apply_jobs()
 
             logger.debug(
                 f"已为群 {group_id} 设置 {news_type} 日报定时任务，"
@@ -73,21 +267,53 @@ class ScheduleManager:
                 news_type=news_type,
             )
 
-    async def remove_job(self, group_id: int, news_type: str) -> bool:
-        """移除定时任务"""
-        job_id = f"daily_news_{group_id}_{news_type}"
+    async def add_jobs(
+        self,
+        group_ids: list[int],
+        news_type: str,
+        hour: int,
+        minute: int,
+        format_type: str = "image",
+    ) -> int:
+        """为多个群批量添加定时任务，只保存和同步一次
+
+        Returns:
+            设置的群数量
+        """
+        if not validate_time(hour, minute):
+            raise InvalidTimeFormatException(
+                message="无效的时间",
+                time_str=f"{hour}:{minute}",
+            )
 
         try:
-            try:
-                scheduler.remove_job(job_id)
-                logger.debug(f"已移除定时任务: {job_id}")
-            except Exception as e:
-                if "No job by the id" in str(e):
-                    logger.debug(f"任务 {job_id} 不存在，跳过移除")
-                else:
-                    logger.debug(f"移除任务时出现异常: {e}")
+            count = schedule_store.set_group_schedules(
+                group_ids,
+                news_type=news_type,
+                schedule_time=format_time(hour, minute),
+                format_type=format_type,
+            )
+            self._register(group_ids, news_type, hour, minute, format_type)
+            self._apply_jobs()
+
+            logger.debug(
+                f"已为 {count} 个群设置 {news_type} 日报定时任务，"
+                f"时间: {format_time(hour, minute)}，格式: {format_type}"
+            )
+            return count
+        except Exception as e:
+            logger.error(f"批量添加定时任务失败 [news_type={news_type}]: {e}")
+            raise ScheduleException(
+                message=f"批量添加定时任务失败: {e}",
+                news_type=news_type,
+            )
 
+    async def remove_job(self, group_id: int, news_type: str) -> bool:
+        """移除定时任务"""
+        try:
             schedule_store.remove_group_schedule(group_id, news_type)
+            self.registry.remove(int(group_id), news_type)
+            self._apply_jobs()
 
             return True
         except Exception as e:
@@ -98,57 +324,138 @@ class ScheduleManager:
                 news_type=news_type,
             )
 
+    async def remove_jobs(self, group_ids: list[int], news_type: str) -> int:
+        """批量移除多个群的定时任务，只保存和同步一次
+
+        Returns:
+            移除的群数量
+        """
+        try:
+            # 订阅可能以别名保存，按索引找出每个群实际保存的日报类型
+            source_name = self._resolve_source_name(news_type)
+            groups_by_key: dict[str, list[int]] = {}
+            for group_id in group_ids:
+                keys = [
+                    key
+                    for key, slot in self.registry.get_group(int(group_id)).items()
+                    if key == news_type or slot[0] == source_name
+                ]
+                for key in keys or [news_type]:
+                    groups_by_key.setdefault(key, []).append(int(group_id))
+
+            count = 0
+            with schedule_store.batch():
+                for key, key_group_ids in groups_by_key.items():
+                    count += schedule_store.remove_group_schedules(key_group_ids, key)
+                    for group_id in key_group_ids:
+                        self.registry.remove(group_id, key)
+            self._apply_jobs()
+
+            return count
+        except Exception as e:
+            logger.error(f"批量移除定时任务失败 [news_type={news_type}]: {e}")
+            raise ScheduleException(
+                message=f"批量移除定时任务失败: {e}",
+                news_type=news_type,
+            )
+
     def get_jobs(self, group_id: int | None = None) -> list[dict[str, Any]]:
-        """获取定时任务列表"""
-        jobs = []
+        """获取定时任务列表，每个群的每个订阅为一项"""
+        from ..api.sources import news_sources
 
-        for job in scheduler.get_jobs():
-            if not job.id.startswith("daily_news_"):
-                continue
+        if group_id is None:
+            group_ids = sorted(self.registry.by_group)
+        else:
+            group_ids = [group_id]
 
-            parts = job.id.split("_")
-            if len(parts) < 3:
-                continue
+        jobs = []
+        for job_group_id in group_ids:
+            for job_news_type, slot in self.registry.get_group(job_group_id).items():
+                source_name, format_type, hour, minute = slot
+                source = news_sources.get(source_name)
+
+                job = scheduler.get_job(self._get_slot_job_id(*slot))
+                next_run = job.next_run_time if job else None
+                next_run_str = next_run.strftime("%Y-%m-%d %H:%M:%S") if next_run else "未知"
+
+                jobs.append(
+                    {
+                        "group_id": job_group_id,
+                        "news_type": job_news_type,
+                        "schedule_time": format_time(hour, minute),
+                        "next_run": next_run_str,
+                        "format_type": format_type,
+                        "news_description": source.description if source else "未知日报类型",
+                    }
+                )
 
-            job_group_id = int(parts[2])
+        return jobs
 
-            if group_id is not None and job_group_id != group_id:
-                continue
+    async def _deliver(self, bot, group_ids: list[int], source, message, items) -> dict[str, Any]:
+        """通过发送调度器向多个群发送已生成的日报，并记录发送快照"""
+        if len(group_ids) > 1:
+            # 图片只写入一次，各群发送同一个文件或地址
+            message = image_outbox.prepare(message)
 
-            job_news_type = parts[3]
+        # 所有群共用一个快照
+        snapshot = news_snapshot_store.create(source.name, items)
+        news_snapshot_store.reserve(source.name, len(group_ids))
 
-            next_run = job.next_run_time
-            next_run_str = next_run.strftime("%Y-%m-%d %H:%M:%S") if next_run else "未知"
+        async def send(group_id: int) -> None:
+            receipt = await bot.send_group_msg(group_id=group_id, message=message)
+            logger.debug(f"已向群 {group_id} 发送 {source.name} 日报")
 
-            schedule_config = None
-            if schedule_store:
-                schedule_config = schedule_store.get_group_schedule(job_group_id, job_news_type)
+            news_snapshot_store.attach(
+                snapshot,
+                message_id=news_snapshot_store.get_message_id(receipt),
+                session_id=news_snapshot_store.get_session_id(group_id=group_id),
+            )
 
-            format_type = "image"
-            if schedule_config and "format_type" in schedule_config:
-                format_type = schedule_config["format_type"]
+        return await send_dispatcher.dispatch(group_ids, send, name=f"{source.name}日报")
 
-            schedule_time = f"{job.trigger.hour:02d}:{job.trigger.minute:02d}"
+    async def send_scheduled_news(
+        self,
+        news_type: str,
+        format_type: str,
+        hour: int,
+        minute: int,
+    ) -> int:
+        """发送定时日报，只获取一次并发送给该时段的所有订阅群
+
+        Returns:
+            发送成功的群数量
+        """
+        group_ids = self.get_slot_groups(news_type, format_type, hour, minute)
+        if not group_ids:
+            logger.debug(f"{news_type} 日报在 {format_time(hour, minute)} 没有订阅的群，跳过发送")
+            return 0
+
+        # 定时推送的渲染优先于命令和详情截图
+        priority_token = render_priority.set(RenderPriority.SCHEDULED)
+        try:
+            bot = get_bot()
 
-            news_description = "未知日报"
             from ..api.sources import get_news_source
 
-            source = get_news_source(job_news_type)
-            if source:
-                news_description = source.description
-
-            jobs.append(
-                {
-                    "group_id": job_group_id,
-                    "news_type": job_news_type,
-                    "schedule_time": schedule_time,
-                    "next_run": next_run_str,
-                    "format_type": format_type,
-                    "news_description": news_description,
-                }
-            )
+            source = get_news_source(news_type)
+            if not source:
+                logger.error(f"未知的日报类型: {news_type}")
+                return 0
 
-        return jobs
+            message = await source.fetch(format_type=format_type)
+            items = source.get_displayed_items(message, format_type)
+
+            stats = await self._deliver(bot, group_ids, source, message, items)
+            logger.info(
+                f"{news_type} 日报定时发送完成，时间: {format_time(hour, minute)}，"
+                f"成功 {stats['sent']}/{stats['total']} 个群"
+            )
+            return stats["sent"]
+        except Exception as e:
+            logger.error(f"定时发送日报失败 [news_type={news_type}, time={format_time(hour, minute)}]: {e}")
+            return 0
+        finally:
+            render_priority.reset(priority_token)
 
     async def send_daily_news(
         self,
@@ -156,7 +463,8 @@ class ScheduleManager:
         news_type: str,
         format_type: str = "image",
     ) -> bool:
-        """发送日报"""
+        """向单个群发送日报"""
+        priority_token = render_priority.set(RenderPriority.SCHEDULED)
         try:
             bot = get_bot()
 
@@ -169,45 +477,43 @@ class ScheduleManager:
                 return False
 
             message = await source.fetch(format_type=format_type)
+            items = source.get_displayed_items(message, format_type)
+            stats = await self._deliver(bot, [group_id], source, message, items)
+            return stats["sent"] > 0
+        except Exception as e:
+            logger.error(f"发送日报失败 [group_id={group_id}, news_type={news_type}]: {e}")
+            return False
+        finally:
+            render_priority.reset(priority_token)
+
+    async def prewarm_daily_news(self, news_type: str, format_type: str = "image") -> bool:
+        """预先获取并渲染日报，写入缓存供定时发送使用"""
+        from ..api.sources import get_news_source
 
-            await bot.send_group_msg(group_id=group_id, message=message)
-            logger.info(f"已向群 {group_id} 发送 {news_type} 日报")
+        source = get_news_source(news_type)
+        if not source:
+            logger.warning(f"预热日报失败，未知的日报类型: {news_type}")
+            return False
 
+        priority_token = render_priority.set(RenderPriority.SCHEDULED)
+        try:
+            await source.fetch(format_type=format_type, force_refresh=True)
+            logger.info(f"已预热 {news_type} 日报，格式: {format_type}")
             return True
         except Exception as e:
-            logger.error(f"发送日报失败 [group_id={group_id}, news_type={news_type}]: {e}")
+            logger.error(f"预热日报失败 [news_type={news_type}, format_type={format_type}]: {e}")
             return False
+        finally:
+            render_priority.reset(priority_token)
 
     async def init_jobs(self) -> bool:
-        """初始化所有定时任务"""
+        """初始化所有定时任务
+
+        直接按已加载的订阅配置注册发送任务，不会重新写入存储。
+        """
+        started = time.perf_counter()
         try:
-            schedules = schedule_store.get_all_schedules()
-
-            for group_id, group_schedules in schedules.items():
-                for news_type, schedule in group_schedules.items():
-                    if "schedule_time" in schedule:
-                        try:
-                            schedule_time = schedule["schedule_time"]
-                            hour, minute = schedule_time.split(":")
-                            format_type = schedule.get("format_type", "image")
-
-                            from ..api.sources import get_news_source
-
-                            if not get_news_source(news_type):
-                                logger.warning(f"未知的日报类型: {news_type}，跳过加载")
-                                continue
-
-                            await self.add_job(
-                                group_id=int(group_id),
-                                news_type=news_type,
-                                hour=int(hour),
-                                minute=int(minute),
-                                format_type=format_type,
-                            )
-                        except Exception as e:
-                            logger.error(
-                                f"加载单个定时任务失败 [group_id={group_id}, news_type={news_type}]: {e}"
-                            )
+            slot_count = self.sync_jobs()
 
             try:
                 scheduler.add_job(
@@ -220,7 +526,27 @@ class ScheduleManager:
             except Exception as e:
                 logger.error(f"添加缓存清理任务失败: {e}")
 
-            logger.info(f"日报调度器初始化完成，已加载 {len(scheduler.get_jobs())} 个定时任务")
+            probe_interval = get_plugin_config(Config).daily_news_probe_interval
+            if probe_interval > 0:
+                from ..api import api_manager
+
+                try:
+                    scheduler.add_job(
+                        api_manager.probe_all,
+                        "interval",
+                        minutes=probe_interval,
+                        id="probe_api_sources",
+                        replace_existing=True,
+                        max_instances=1,
+                        coalesce=True,
+                    )
+                except Exception as e:
+                    logger.error(f"添加API源探测任务失败: {e}")
+
+            logger.info(
+                f"日报调度器初始化完成，共 {slot_count} 个发送时段，共 {len(self.registry.by_group)} 个订阅群，"
+                f"耗时 {(time.perf_counter() - started) * 1000:.1f}毫秒"
+            )
             return True
         except Exception as e:
             logger.error(f"日报调度器初始化失败: {e}")
@@ -228,9 +554,12 @@ class ScheduleManager:
 
     async def clear_expired_cache(self) -> int:
         """清理过期缓存"""
-        from ..utils.cache import news_cache
+        from ..utils.cache import image_outbox_store, news_cache, render_cache
 
         count = news_cache.clear_expired()
+        news_snapshot_store.clear_expired()
+        render_cache.cleanup_expired()
+        image_outbox_store.cleanup_expired()
         logger.info(f"已清理过期缓存，共 {count} 项")
         return count
 
@@ -6,6 +6,7 @@ from nonebot import logger, get_plugin_config
 from .. import HAS_HTMLRENDER
 from ..config import Config
 from .cache import weibo_screenshot_cache
+from .render import render_scheduler
 
 
 class WeiboScreenshotError(Exception):
@@ -322,7 +323,7 @@ async def capture_webpage_screenshot(
             selector = selector or SITE_SELECTORS[site_type.lower()]
             custom_script = custom_script or SITE_SCRIPTS[site_type.lower()]
 
-        async with get_new_page() as page:
+        async with render_scheduler.slot(), get_new_page() as page:
             try:
                 await page.goto(url, wait_until="networkidle", timeout=timeout)
             except Exception as timeout_e:
@@ -394,6 +395,9 @@ def optimize_image(image_data: bytes, max_size: int = 3 * 1024 * 1024) -> bytes:
 
     try:
         img = Image.open(BytesIO(image_data))
+        if img.mode not in ("RGB", "L"):
+            # JPEG 不支持透明通道，截图通常为 RGBA
+            img = img.convert("RGB")
 
         quality = 75
         output = BytesIO()
@@ -555,7 +559,7 @@ class WeiboScreenshotTool:
             logger.debug(f"清理缓存时出错: {e}")
 
         try:
-            async with get_new_page() as page:
+            async with render_scheduler.slot(), get_new_page() as page:
                 await page.set_extra_http_headers(
                     {
                         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
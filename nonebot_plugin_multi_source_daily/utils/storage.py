@@ -0,0 +1,342 @@
+"""SQLite存储模块"""
+
+import asyncio
+import json
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict
+
+from nonebot import logger, require, get_plugin_config
+
+require("nonebot_plugin_localstore")
+import nonebot_plugin_localstore as store
+
+from ..config import Config
+
+
+def get_storage_dir() -> Path:
+    """获取存储文件所在目录"""
+    try:
+        config_dir = store.get_plugin_config_dir()
+    except (AttributeError, Exception):
+        try:
+            config_dir = store.get_config_dir("nonebot_plugin_multi_source_daily")
+        except (AttributeError, Exception):
+            config_dir = Path.home() / ".nonebot" / "nonebot_plugin_multi_source_daily" / "config"
+            config_dir.mkdir(parents=True, exist_ok=True)
+
+    return config_dir
+
+
+class SqliteDatabase:
+    """SQLite数据库
+
+    使用 WAL 模式，读写互不阻塞，单行修改无需重写整个文件。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS schedules (
+        group_id TEXT NOT NULL,
+        news_type TEXT NOT NULL,
+        schedule_time TEXT NOT NULL,
+        format_type TEXT NOT NULL,
+        PRIMARY KEY (group_id, news_type)
+    );
+    CREATE INDEX IF NOT EXISTS idx_schedules_news_type ON schedules (news_type);
+    CREATE TABLE IF NOT EXISTS api_status (
+        news_type TEXT NOT NULL,
+        url TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        PRIMARY KEY (news_type, url)
+    );
+    """
+
+    def __init__(self, file_name: str = "daily_news.db"):
+        """初始化数据库连接并创建表"""
+        self.db_file = get_storage_dir() / file_name
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        logger.debug(f"已打开SQLite数据库: {self.db_file}")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """在事务中执行，出错时回滚"""
+        with self.conn:
+            yield self.conn
+
+    def is_empty(self, table: str) -> bool:
+        """检查表是否为空"""
+        return self.conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None
+
+    def checkpoint(self) -> None:
+        """将 WAL 日志写回数据库文件"""
+        try:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        except sqlite3.Error as e:
+            logger.debug(f"SQLite检查点失败: {e}")
+
+    def migrate_json(self, file_name: str) -> Any | None:
+        """读取待迁移的JSON存储文件，导入完成后需调用 mark_migrated
+
+        Returns:
+            文件内容，文件不存在或解析失败时返回None
+        """
+        json_file = get_storage_dir() / file_name
+        if not json_file.exists():
+            return None
+
+        try:
+            with open(json_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"读取待迁移的存储文件失败: {json_file}, {e}")
+            return None
+
+        return data
+
+    def mark_migrated(self, file_name: str) -> None:
+        """将已迁移的JSON存储文件重命名"""
+        json_file = get_storage_dir() / file_name
+        try:
+            json_file.rename(json_file.with_name(f"{json_file.name}.migrated"))
+            logger.info(f"已将 {json_file.name} 迁移到SQLite数据库")
+        except Exception as e:
+            logger.warning(f"重命名已迁移的存储文件失败: {json_file}, {e}")
+
+
+class SqliteScheduleStorage:
+    """基于SQLite的定时任务存储类
+
+    与 ScheduleStorage 接口一致，按 (group_id, news_type) 建立主键，按日报类型建立索引。
+    """
+
+    JSON_FILE = "schedules.json"
+
+    def __init__(self, db: SqliteDatabase):
+        """初始化定时任务存储"""
+        self.db = db
+        self._migrate_json()
+        self._migrate_old_data()
+
+    def _migrate_json(self) -> int:
+        """首次使用时从 schedules.json 导入数据"""
+        if not self.db.is_empty("schedules"):
+            return 0
+
+        data = self.db.migrate_json(self.JSON_FILE)
+        if data is None:
+            return 0
+
+        rows = [
+            (str(group_id), news_type, schedule["schedule_time"], schedule.get("format_type", "image"))
+            for group_id, schedules in data.items()
+            for news_type, schedule in schedules.items()
+        ]
+        with self.db.transaction() as conn:
+            conn.executemany("INSERT OR REPLACE INTO schedules VALUES (?, ?, ?, ?)", rows)
+
+        self.db.mark_migrated(self.JSON_FILE)
+        logger.info(f"已迁移 {len(rows)} 条定时任务配置")
+        return len(rows)
+
+    def _migrate_old_data(self) -> bool:
+        """迁移旧数据：将'知乎'改为'知乎日报'"""
+        with self.db.transaction() as conn:
+            cursor = conn.execute("UPDATE OR REPLACE schedules SET news_type = '知乎日报' WHERE news_type = '知乎'")
+
+        if cursor.rowcount > 0:
+            logger.info(f"已将 {cursor.rowcount} 个群的'知乎'定时任务迁移到'知乎日报'")
+            return True
+        return False
+
+    @staticmethod
+    def _to_schedule(row: sqlite3.Row) -> Dict[str, Any]:
+        """将查询结果转为定时任务配置"""
+        return {"schedule_time": row["schedule_time"], "format_type": row["format_type"]}
+
+    def set_group_schedule(self, group_id: int, news_type: str, schedule_time: str, format_type: str) -> bool:
+        """设置群组的定时任务配置"""
+        return self.set_group_schedules([group_id], news_type, schedule_time, format_type) > 0
+
+    def set_group_schedules(
+        self,
+        group_ids: list[int],
+        news_type: str,
+        schedule_time: str,
+        format_type: str,
+    ) -> int:
+        """批量设置多个群组的定时任务配置"""
+        rows = [(str(group_id), news_type, schedule_time, format_type) for group_id in group_ids]
+        with self.db.transaction() as conn:
+            conn.executemany("INSERT OR REPLACE INTO schedules VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def remove_group_schedule(self, group_id: int, news_type: str) -> bool:
+        """移除群组的特定日报类型的定时任务配置"""
+        return self.remove_group_schedules([group_id], news_type) > 0
+
+    def remove_group_schedules(self, group_ids: list[int], news_type: str) -> int:
+        """批量移除多个群组的特定日报类型的定时任务配置"""
+        with self.db.transaction() as conn:
+            cursor = conn.executemany(
+                "DELETE FROM schedules WHERE group_id = ? AND news_type = ?",
+                [(str(group_id), news_type) for group_id in group_ids],
+            )
+        return cursor.rowcount
+
+    def get_group_schedules(self, group_id: int) -> Dict[str, Dict[str, Any]]:
+        """获取群组的所有定时任务配置"""
+        rows = self.db.conn.execute("SELECT * FROM schedules WHERE group_id = ?", (str(group_id),))
+        return {row["news_type"]: self._to_schedule(row) for row in rows}
+
+    def get_all_schedules(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """获取所有定时任务配置"""
+        schedules: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for row in self.db.conn.execute("SELECT * FROM schedules ORDER BY group_id"):
+            schedules.setdefault(row["group_id"], {})[row["news_type"]] = self._to_schedule(row)
+        return schedules
+
+    def get_group_schedule(self, group_id: int, news_type: str) -> Dict[str, Any] | None:
+        """获取群组的特定日报类型的定时任务配置"""
+        row = self.db.conn.execute(
+            "SELECT * FROM schedules WHERE group_id = ? AND news_type = ?",
+            (str(group_id), news_type),
+        ).fetchone()
+        return self._to_schedule(row) if row else None
+
+    def get_all_groups_by_news_type(self, news_type: str) -> list[str]:
+        """获取订阅了特定日报类型的所有群组ID"""
+        rows = self.db.conn.execute("SELECT group_id FROM schedules WHERE news_type = ?", (news_type,))
+        return [row["group_id"] for row in rows]
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """批量修改，每次修改都已单独提交，仅为与 JSON 存储保持接口一致"""
+        yield
+
+    async def flush(self) -> bool:
+        """写回 WAL 日志"""
+        self.db.checkpoint()
+        return True
+
+
+class SqliteApiStatusStorage:
+    """基于SQLite的API状态存储类
+
+    与 ApiStatusStorage 接口一致，data 为 {日报类型: [API源状态]}，
+    保存时只写入发生变化的API源，在事件循环中调用时同样延迟合并写入。
+    """
+
+    JSON_FILE = "api_status.json"
+
+    def __init__(self, db: SqliteDatabase):
+        """初始化API状态存储"""
+        self.db = db
+        self._saved: dict[tuple[str, str], tuple[int, str]] = {}
+        self._dirty = False
+        self._save_task: asyncio.Task | None = None
+        self.data: Dict[str, Any] = self._load_data()
+
+        if not self.data:
+            migrated = self.db.migrate_json(self.JSON_FILE)
+            if migrated is not None:
+                self.data = migrated
+                self.save()
+                self.db.mark_migrated(self.JSON_FILE)
+
+    def _load_data(self) -> Dict[str, Any]:
+        """加载数据"""
+        data: Dict[str, Any] = {}
+        for row in self.db.conn.execute("SELECT * FROM api_status ORDER BY news_type, position"):
+            try:
+                status = json.loads(row["status"])
+            except json.JSONDecodeError:
+                logger.warning(f"解析API源状态失败: {row['url']}")
+                continue
+            data.setdefault(row["news_type"], []).append(status)
+            self._saved[(row["news_type"], row["url"])] = (row["position"], row["status"])
+        return data
+
+    def save(self) -> bool:
+        """保存当前数据
+
+        在事件循环中调用时延迟合并写入，否则立即写入。
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.save_now()
+
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._delayed_save())
+        return True
+
+    async def _delayed_save(self) -> None:
+        """等待合并窗口结束后写入"""
+        delay = get_plugin_config(Config).daily_news_storage_save_delay
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._dirty:
+            self.save_now()
+
+    def save_now(self) -> bool:
+        """立即保存当前数据"""
+        self._dirty = False
+        current: dict[tuple[str, str], tuple[int, str]] = {}
+        for news_type, sources in self.data.items():
+            for position, status in enumerate(sources):
+                url = status.get("url")
+                if url:
+                    current[(news_type, url)] = (position, json.dumps(status, ensure_ascii=False, sort_keys=True))
+
+        changed = [
+            (news_type, url, position, status)
+            for (news_type, url), (position, status) in current.items()
+            if self._saved.get((news_type, url)) != (position, status)
+        ]
+        removed = [key for key in self._saved if key not in current]
+        if not changed and not removed:
+            return True
+
+        try:
+            with self.db.transaction() as conn:
+                conn.executemany("INSERT OR REPLACE INTO api_status VALUES (?, ?, ?, ?)", changed)
+                conn.executemany("DELETE FROM api_status WHERE news_type = ? AND url = ?", removed)
+        except sqlite3.Error as e:
+            logger.error(f"保存API源状态失败: {e}")
+            self._dirty = True
+            return False
+
+        self._saved = current
+        return True
+
+    def reset(self) -> bool:
+        """重置为默认值"""
+        self.data = {}
+        return self.save()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """批量修改，退出时只保存一次"""
+        try:
+            yield
+        finally:
+            self.save()
+
+    async def flush(self) -> bool:
+        """写入未保存的修改并写回 WAL 日志"""
+        task, self._save_task = self._save_task, None
+        if task is not None and not task.done():
+            task.cancel()
+        saved = self.save_now() if self._dirty else True
+        self.db.checkpoint()
+        return saved
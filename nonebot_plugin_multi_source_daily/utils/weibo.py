@@ -1,16 +1,18 @@
 """微博详情获取工具"""
 
 import re
-import httpx
 from typing import Optional
 from nonebot import logger, get_plugin_config
 
 from ..config import Config
+from .http import get_http_client, host_limiter
 
 
 class WeiboDetailFetcher:
     """微博详情获取器"""
 
+    CLIENT_NAME = "weibo"
+
     def __init__(self):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -68,20 +70,21 @@ class WeiboDetailFetcher:
             headers["Cookie"] = cookie
             headers["Referer"] = "https://weibo.com/"
 
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(detail_url, headers=headers)
+            client = get_http_client(self.CLIENT_NAME)
+            async with host_limiter.limit(detail_url):
+                response = await client.get(detail_url, headers=headers, timeout=10.0)
 
-                if response.status_code != 200:
-                    logger.error(f"获取微博详情失败，状态码: {response.status_code}")
-                    return None
+            if response.status_code != 200:
+                logger.error(f"获取微博详情失败，状态码: {response.status_code}")
+                return None
 
-                data = response.json()
-                if not data.get("ok"):
-                    logger.error(f"微博API返回错误: {data}")
-                    return None
+            data = response.json()
+            if not data.get("ok"):
+                logger.error(f"微博API返回错误: {data}")
+                return None
 
-                weibo_data = data.get("data", {})
-                return self._parse_weibo_content(weibo_data)
+            weibo_data = data.get("data", {})
+            return self._parse_weibo_content(weibo_data)
 
         except Exception as e:
             logger.error(f"获取微博详情时发生错误: {e}")
@@ -93,9 +96,10 @@ class WeiboDetailFetcher:
             headers = self.headers.copy()
             headers["Cookie"] = cookie
 
-            async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-                response = await client.get(short_url, headers=headers)
-                return str(response.url)
+            client = get_http_client(self.CLIENT_NAME)
+            async with host_limiter.limit(short_url):
+                response = await client.get(short_url, headers=headers, timeout=10.0, follow_redirects=True)
+            return str(response.url)
         except Exception as e:
             logger.error(f"解析短链接失败: {e}")
             return None